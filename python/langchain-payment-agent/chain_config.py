@@ -7,7 +7,8 @@ To change chain or token, edit your .env file:
 """
 
 import os
-from dataclasses import dataclass
+import functools
+from dataclasses import dataclass, field
 
 # Token contracts
 USDC_CONTRACTS = {
@@ -45,6 +46,29 @@ EXPLORERS = {
     "arbitrum": "https://arbiscan.io"
 }
 
+# Approximate block times - used to pace receipt polling
+BLOCK_TIME_SECONDS = {
+    "ethereum": 12.0,
+    "base": 2.0,
+    "polygon": 2.0,
+    "arbitrum": 0.25
+}
+
+# Token -> (per-chain contracts, decimals)
+TOKEN_CONTRACTS = {
+    "USDC": (USDC_CONTRACTS, 6),
+    "USDT": (USDT_CONTRACTS, 6),
+    "DAI": (DAI_CONTRACTS, 18)  # DAI uses 18 decimals
+}
+
+# Chain -> (RPC env var, default public RPC)
+RPC_ENV = {
+    "base": ("BASE_RPC_URL", "https://mainnet.base.org"),
+    "ethereum": ("ETHEREUM_RPC_URL", "https://eth-mainnet.public.blastapi.io"),
+    "polygon": ("POLYGON_RPC_URL", "https://polygon-rpc.com"),
+    "arbitrum": ("ARBITRUM_RPC_URL", "https://arb1.arbitrum.io/rpc")
+}
+
 @dataclass
 class ChainConfig:
     chain: str
@@ -54,10 +78,21 @@ class ChainConfig:
     token_contract: str
     decimals: int
     explorer: str
+    atomic_multiplier: int = field(init=False)
+
+    def __post_init__(self):
+        # 10**decimals, computed once so per-payment USD -> atomic scaling is a single multiply
+        self.atomic_multiplier = 10 ** self.decimals
 
 
+@functools.lru_cache(maxsize=1)
 def get_chain_config():
-    """Load chain/token config from environment variables"""
+    """
+    Load chain/token config from environment variables.
+
+    The result is cached for the lifetime of the process; call
+    get_chain_config.cache_clear() after changing the environment.
+    """
     chain = os.getenv('PAYMENT_CHAIN', 'base').lower()
     token = os.getenv('PAYMENT_TOKEN', 'USDC').upper()
 
@@ -66,29 +101,17 @@ def get_chain_config():
         raise ValueError(f"Invalid PAYMENT_CHAIN: {chain}. Options: base, ethereum, polygon, arbitrum")
 
     # Get token contract
-    if token == 'USDC':
-        token_contract = USDC_CONTRACTS.get(chain)
-        decimals = 6
-    elif token == 'USDT':
-        token_contract = USDT_CONTRACTS.get(chain)
-        decimals = 6
-        if not token_contract:
-            raise ValueError(f"USDT not available on {chain}. Use USDC or DAI instead.")
-    elif token == 'DAI':
-        token_contract = DAI_CONTRACTS.get(chain)
-        decimals = 18  # DAI uses 18 decimals
-    else:
+    if token not in TOKEN_CONTRACTS:
         raise ValueError(f"Invalid PAYMENT_TOKEN: {token}. Options: USDC, USDT, DAI")
 
+    contracts, decimals = TOKEN_CONTRACTS[token]
+    token_contract = contracts.get(chain)
+    if not token_contract:
+        raise ValueError(f"{token} not available on {chain}. Use USDC or DAI instead.")
+
     # Get RPC URL
-    if chain == 'base':
-        rpc_url = os.getenv('BASE_RPC_URL', 'https://mainnet.base.org')
-    elif chain == 'ethereum':
-        rpc_url = os.getenv('ETHEREUM_RPC_URL', 'https://eth-mainnet.public.blastapi.io')
-    elif chain == 'polygon':
-        rpc_url = os.getenv('POLYGON_RPC_URL', 'https://polygon-rpc.com')
-    elif chain == 'arbitrum':
-        rpc_url = os.getenv('ARBITRUM_RPC_URL', 'https://arb1.arbitrum.io/rpc')
+    env_var, default_rpc_url = RPC_ENV[chain]
+    rpc_url = os.getenv(env_var, default_rpc_url)
 
     return ChainConfig(
         chain=chain,
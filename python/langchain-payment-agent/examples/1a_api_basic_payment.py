@@ -4,7 +4,7 @@ AgentGatePay + LangChain Integration - Example 1a: REST API + Local Signing
 
 This example demonstrates a simple autonomous payment flow using:
 - AgentGatePay REST API (via published SDK v1.1.6)
-- LangChain agent with payment tools
+- Payment tools run as a fixed workflow, or by a LangChain agent (AGENTPAY_USE_LLM=1)
 - Local transaction signing (private key in .env)
 - Multi-chain blockchain payments (Base, Ethereum, Polygon, Arbitrum)
 - Multi-token support (USDC, USDT, DAI)
@@ -12,12 +12,12 @@ This example demonstrates a simple autonomous payment flow using:
 Flow:
 1. Configure chain and token (from .env file)
 2. Issue AP2 mandate ($100 budget)
-3. Sign blockchain transactions locally (Web3.py)
+3. Sign blockchain transactions locally (eth_account + JSON-RPC)
 4. Submit payment proof to AgentGatePay
 5. Verify payment completion and view audit logs
 
 Requirements:
-- pip install agentgatepay-sdk>=1.1.6 langchain langchain-openai web3 python-dotenv
+- pip install agentgatepay-sdk>=1.1.6 langchain langchain-openai eth-account python-dotenv
 - .env file with configuration (see .env.example)
 
 Multi-Chain Configuration:
@@ -30,27 +30,37 @@ For Production: See Example 1b (external TX signing service)
 """
 
 import os
+import re
 import sys
 import time
 import json
 import base64
-from typing import Dict, Any
+import functools
+from decimal import Decimal
+from typing import Dict, Any, Optional
 from dotenv import load_dotenv
-from web3 import Web3
-from eth_account import Account
-from agentgatepay_sdk import AgentGatePay
 import requests
-
-# LangChain imports (updated for LangChain 1.x)
-from langchain_core.tools import Tool
-from langchain.agents import create_agent
-from langchain_openai import ChatOpenAI
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# orjson is optional - ~3-10x faster JSON for RPC and gateway payloads, stdlib fallback
+try:
+    import orjson
+    json_dumps = orjson.dumps
+    json_loads = orjson.loads
+except ImportError:
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(',', ':')).encode()
+    json_loads = json.loads
+
+# Heavy imports (eth_account, agentgatepay_sdk, LangChain) are deferred until
+# configuration has been validated - see build_agent() and __main__
 
 # Add parent directory to path for utils import
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-# Utils for mandate storage
-from utils import save_mandate, get_mandate, clear_mandate
+# Utils for mandate storage and config caching
+from utils import save_mandate, get_mandate, clear_mandate, get_cached_config, save_cached_config
 
 # Load environment variables
 load_dotenv()
@@ -64,7 +74,7 @@ from chain_config import get_chain_config
 # TRANSACTION SIGNING
 # ========================================
 #
-# This example uses LOCAL SIGNING (Web3.py with private key).
+# This example uses LOCAL SIGNING (eth_account with private key).
 #
 # ⚠️ WARNING: Local signing is NOT recommended for production!
 #
@@ -89,10 +99,18 @@ BUYER_EMAIL = os.getenv('BUYER_EMAIL')
 BUYER_PRIVATE_KEY = os.getenv('BUYER_PRIVATE_KEY')
 SELLER_WALLET = os.getenv('SELLER_WALLET')
 
+# Gateway endpoints and headers - fixed for the process, built once
+COMMISSION_CONFIG_URL = f"{AGENTPAY_API_URL}/v1/config/commission"
+MANDATES_VERIFY_URL = f"{AGENTPAY_API_URL}/mandates/verify"
+GATEWAY_JSON_HEADERS = {"x-api-key": BUYER_API_KEY, "Content-Type": "application/json"}
+
 # Payment configuration
 RESOURCE_PRICE_USD = 0.01
 MANDATE_BUDGET_USD = 100.0
 
+# ERC-20 transfer(address,uint256) selector - first 4 bytes of its keccak256 hash
+TRANSFER_SELECTOR = bytes.fromhex("a9059cbb")
+
 # Multi-chain/token configuration (set after interactive selection)
 # To manually configure without interactive prompt, uncomment and set:
 # config = ChainConfig(
@@ -106,15 +124,30 @@ MANDATE_BUDGET_USD = 100.0
 # )
 # Note: USDT not available on Base. DAI uses 18 decimals. See README.md
 config = None  # Will be set via get_or_create_config() in main()
+x402_url_prefix = None  # Resource URL up to price_usd= - chain/token are fixed per run
 
 # ========================================
 # INITIALIZE CLIENTS
 # ========================================
 # Note: Clients initialized in main() after chain/token configuration
 
+# Shared HTTP session - keep-alive reuses the TLS connection to the gateway
+HTTP_TIMEOUT = (3.05, 30)  # (connect, read) seconds
+SETTLEMENT_TIMEOUT = (3.05, 120)  # x402 settlement may wait for on-chain confirmation
+JSON_HEADERS = {"Content-Type": "application/json"}
+http_session = requests.Session()
+http_session.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    # read=0: never resend a request the gateway may still be processing - a
+    # timed-out settlement would otherwise submit the payment proof again
+    max_retries=Retry(total=2, read=0, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+))
+
 agentpay = None
-web3 = None
 buyer_account = None
+buyer_address = None  # Checksum address, read once from buyer_account in main()
+agent_id = None  # Mandate subject for this buyer - set in main()
 
 # ========================================
 # AGENT TOOLS
@@ -123,55 +156,130 @@ buyer_account = None
 # Global mandate storage
 current_mandate = None
 
-def get_commission_config() -> dict:
-    try:
-        response = requests.get(
-            f"{AGENTPAY_API_URL}/v1/config/commission",
-            headers={"x-api-key": BUYER_API_KEY}
-        )
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        print(f"⚠️  Failed to fetch commission config: {e}")
-        return None
+# Commission config changes rarely - cache it in-process and on disk (across runs)
+# so repeated payments and fresh runs skip the round-trip
+COMMISSION_CONFIG_TTL_SECONDS = 300
+_commission_cache = {"data": None, "expires": 0.0}
 
+def get_commission_config() -> dict:
+    if _commission_cache["data"] and time.monotonic() < _commission_cache["expires"]:
+        return _commission_cache["data"]
+
+    data, ttl_left = get_cached_config('commission', AGENTPAY_API_URL)
+    if not data:
+        try:
+            response = http_session.get(
+                COMMISSION_CONFIG_URL,
+                headers={"x-api-key": BUYER_API_KEY},
+                timeout=HTTP_TIMEOUT
+            )
+            response.raise_for_status()
+            data = json_loads(response.content)
+        except Exception as e:
+            print(f"⚠️  Failed to fetch commission config: {e}")
+            return None
+        save_cached_config('commission', AGENTPAY_API_URL, data, COMMISSION_CONFIG_TTL_SECONDS)
+        ttl_left = COMMISSION_CONFIG_TTL_SECONDS
+
+    data['commission_rate_decimal'] = Decimal(str(data['commission_rate']))
+    data['commission_address_word'] = _pad_address(data['commission_address'])
+    _commission_cache["data"] = data
+    _commission_cache["expires"] = time.monotonic() + ttl_left  # a disk hit keeps its original expiry
+    return data
+
+ADDRESS_RE = re.compile(r'0x[0-9a-fA-F]{40}')
+
+@functools.lru_cache(maxsize=256)
+def _pad_address(address: str) -> bytes:
+    """Left-pad a 0x-prefixed 20-byte address to a 32-byte ABI word (cached per address)"""
+    # int() alone would also accept truncated/odd-length hex, '_' and whitespace and
+    # silently pad it into a different address - transfers can't be reversed
+    if not ADDRESS_RE.fullmatch(address):
+        raise ValueError(f"Invalid address (expected 0x + 40 hex digits): {address!r}")
+    return int(address, 16).to_bytes(32, byteorder='big')
+
+def _encode_transfer(to_word: bytes, amount_atomic: int) -> bytes:
+    """ABI-encode ERC-20 transfer(to, amount) calldata (68 bytes)"""
+    # join sizes the output once - no intermediate concatenation buffers
+    return b''.join((TRANSFER_SELECTOR, to_word, amount_atomic.to_bytes(32, byteorder='big')))
+
+@functools.lru_cache(maxsize=32)
 def decode_mandate_token(token: str) -> dict:
+    # Pure function of the token string - cached since the same token is decoded repeatedly per run.
+    # Callers must treat the returned dict as read-only.
     try:
         parts = token.split('.')
         if len(parts) != 3:
             return {}
         payload_b64 = parts[1]
-        padding = 4 - (len(payload_b64) % 4)
-        if padding != 4:
-            payload_b64 += '=' * padding
+        payload_b64 += '=' * (-len(payload_b64) % 4)
         payload_json = base64.urlsafe_b64decode(payload_b64)
-        return json.loads(payload_json)
-    except:
+        return json_loads(payload_json)
+    except Exception:
         return {}
 
+# A locally stored budget verified this recently is trusted without asking the gateway again
+MANDATE_BUDGET_FRESH_SECONDS = 60
+
+def _budget_is_fresh(mandate: dict) -> bool:
+    verified_at = mandate.get('budget_verified_at')
+    return (
+        mandate.get('budget_remaining') is not None
+        and verified_at is not None
+        and time.time() - verified_at < MANDATE_BUDGET_FRESH_SECONDS
+    )
+
+@functools.lru_cache(maxsize=4)
+def _get_live_mandate(agent_id: str) -> Optional[dict]:
+    """
+    Load the stored mandate for agent_id with its live budget_remaining.
+
+    Cached for the process lifetime so the gateway is verified at most once per
+    run - call _get_live_mandate.cache_clear() after saving a new mandate.
+    """
+    mandate = get_mandate(agent_id)
+    if not mandate:
+        return None
+
+    if _budget_is_fresh(mandate):
+        return mandate
+
+    token = mandate.get('mandate_token')
+
+    # An expired token would fail verification anyway - drop it without the round-trip
+    # (the JWT budget is the issued amount, so only its exp claim is trusted locally)
+    exp = decode_mandate_token(token).get('exp')
+    if exp is not None and exp <= time.time():
+        clear_mandate(agent_id)
+        return None
+
+    # Get LIVE budget from gateway (not JWT which is static)
+    verify_response = http_session.post(
+        MANDATES_VERIFY_URL,
+        headers=GATEWAY_JSON_HEADERS,
+        json={"mandate_token": token},
+        timeout=HTTP_TIMEOUT
+    )
+
+    if verify_response.status_code == 200:
+        mandate['budget_remaining'] = json_loads(verify_response.content).get('budget_remaining', 'Unknown')
+        mandate['budget_verified_at'] = time.time()
+        save_mandate(agent_id, mandate)
+    else:
+        token_data = decode_mandate_token(token)
+        mandate['budget_remaining'] = token_data.get('budget_remaining', mandate.get('budget_usd', 'Unknown'))
+
+    return mandate
+
 def issue_payment_mandate(budget_usd: float) -> str:
     global current_mandate
 
     try:
-        agent_id = f"research-assistant-{buyer_account.address}"
-        existing_mandate = get_mandate(agent_id)
+        existing_mandate = _get_live_mandate(agent_id)
 
         if existing_mandate:
             token = existing_mandate.get('mandate_token')
-
-            # Get LIVE budget from gateway
-            verify_response = requests.post(
-                f"{AGENTPAY_API_URL}/mandates/verify",
-                headers={"x-api-key": BUYER_API_KEY, "Content-Type": "application/json"},
-                json={"mandate_token": token}
-            )
-
-            if verify_response.status_code == 200:
-                verify_data = verify_response.json()
-                budget_remaining = verify_data.get('budget_remaining', 'Unknown')
-            else:
-                token_data = decode_mandate_token(token)
-                budget_remaining = token_data.get('budget_remaining', existing_mandate.get('budget_usd', 'Unknown'))
+            budget_remaining = existing_mandate['budget_remaining']
 
             print(f"\n♻️  Reusing mandate (Budget: ${budget_remaining})")
             current_mandate = existing_mandate
@@ -197,6 +305,7 @@ def issue_payment_mandate(budget_usd: float) -> str:
 
         current_mandate = mandate_with_budget
         save_mandate(agent_id, mandate_with_budget)
+        _get_live_mandate.cache_clear()
 
         print(f"✅ Mandate created (Budget: ${budget_usd})")
 
@@ -207,76 +316,159 @@ def issue_payment_mandate(budget_usd: float) -> str:
         return f"Failed: {str(e)}"
 
 
+def rpc_call(method: str, params: list):
+    """Make a single JSON-RPC call to the configured chain RPC"""
+    response = http_session.post(
+        config.rpc_url,
+        data=json_dumps({"jsonrpc": "2.0", "id": 1, "method": method, "params": params}),
+        headers=JSON_HEADERS,
+        timeout=HTTP_TIMEOUT
+    )
+    response.raise_for_status()
+    result = json_loads(response.content)
+    if 'error' in result:
+        raise Exception(f"{method} failed: {result['error']}")
+    return result['result']
+
+
+def rpc_batch(calls: list) -> list:
+    """
+    Make several JSON-RPC calls in a single batch request.
+
+    calls is a list of (method, params) tuples. Falls back to one call per
+    entry when the RPC provider does not support batching. Returns results
+    in the same order as the input.
+    """
+    batch = [
+        {"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+        for i, (method, params) in enumerate(calls)
+    ]
+
+    response = http_session.post(config.rpc_url, data=json_dumps(batch), headers=JSON_HEADERS, timeout=HTTP_TIMEOUT)
+    try:
+        # Providers/proxies may answer with an HTML, text or empty error body
+        results = json_loads(response.content) if response.ok else None
+    except ValueError:
+        results = None
+
+    if not isinstance(results, list):
+        # Provider rejected the batch - nothing was executed, call individually
+        return [rpc_call(method, params) for method, params in calls]
+
+    by_id = {item.get('id'): item for item in results}
+    values = []
+    for i, (method, _) in enumerate(calls):
+        item = by_id.get(i, {})
+        if 'result' not in item:
+            raise Exception(f"{method} failed: {item.get('error', 'missing response')}")
+        values.append(item['result'])
+    return values
+
+
+# Fees move slowly relative to a payment - reuse a recent reading
+FEE_TTL_SECONDS = 5
+MIN_PRIORITY_FEE_WEI = 10_000_000  # 0.01 gwei floor for the tip
+_fee_cache = {"value": None, "expires": 0.0}
+
+def get_nonce_and_fees(address: str) -> tuple:
+    """
+    Fetch the pending nonce and EIP-1559 fees in one round-trip.
+
+    Returns (nonce, max_fee_per_gas, max_priority_fee_per_gas). A single
+    eth_feeHistory call gives both the next block's base fee and the median
+    tip; only the nonce is requested when recent fees are cached.
+    """
+    if _fee_cache["value"] is not None and time.monotonic() < _fee_cache["expires"]:
+        return (int(rpc_call("eth_getTransactionCount", [address, "pending"]), 16), *_fee_cache["value"])
+
+    nonce_hex, fee_history = rpc_batch([
+        ("eth_getTransactionCount", [address, "pending"]),
+        ("eth_feeHistory", ["0x1", "latest", [50]])
+    ])
+
+    # baseFeePerGas has one extra entry - the base fee of the next block
+    base_fee = int(fee_history['baseFeePerGas'][-1], 16)
+    rewards = fee_history.get('reward') or [[hex(MIN_PRIORITY_FEE_WEI)]]
+    priority_fee = max(int(rewards[-1][0], 16), MIN_PRIORITY_FEE_WEI)
+
+    # 2x base fee covers several consecutive full blocks before the TX would be priced out
+    _fee_cache["value"] = (2 * base_fee + priority_fee, priority_fee)
+    _fee_cache["expires"] = time.monotonic() + FEE_TTL_SECONDS
+    return (int(nonce_hex, 16), *_fee_cache["value"])
+
+
+def send_raw_transactions(raw_transactions: list) -> list:
+    """Broadcast signed transactions in one batch; returns 0x-prefixed tx hashes in input order"""
+    return rpc_batch([("eth_sendRawTransaction", ["0x" + bytes(raw).hex()]) for raw in raw_transactions])
+
+
 def sign_blockchain_payment(payment_input: str) -> str:
     try:
         parts = payment_input.split(',')
         if len(parts) != 2:
             return f"Error: Invalid format"
 
-        amount_usd = float(parts[0].strip())
+        amount_usd = Decimal(parts[0].strip())
         recipient = parts[1].strip()
 
         commission_config = get_commission_config()
         if not commission_config:
             return "Error: Failed to fetch commission config"
 
-        commission_address = commission_config['commission_address']
-        commission_rate = commission_config['commission_rate']
+        commission_address_word = commission_config['commission_address_word']
+        commission_rate = commission_config['commission_rate_decimal']
 
         print(f"\n💳 Signing payment (${amount_usd} {config.token})...")
         print(f"   Chain: {config.chain.title()} (ID: {config.chain_id})")
         print(f"   Token: {config.token} ({config.decimals} decimals)")
 
-        commission_amount_usd = amount_usd * commission_rate
-        merchant_amount_usd = amount_usd - commission_amount_usd
-        merchant_amount_atomic = int(merchant_amount_usd * (10 ** config.decimals))
-        commission_amount_atomic = int(commission_amount_usd * (10 ** config.decimals))
-
-        transfer_function_signature = web3.keccak(text="transfer(address,uint256)")[:4]
+        # Exact decimal -> atomic conversion; merchant gets the remainder so the split always sums to the total
+        amount_atomic = int(amount_usd * (10 ** config.decimals))
+        commission_amount_atomic = int(amount_atomic * commission_rate)
+        merchant_amount_atomic = amount_atomic - commission_amount_atomic
 
-        # Fetch nonce once for both transactions
-        nonce = web3.eth.get_transaction_count(buyer_account.address)
+        # Fetch nonce and fees once - both transactions share them (nonce, nonce + 1).
+        # 'pending' includes our own in-flight transactions from a previous payment.
+        nonce, max_fee, priority_fee = get_nonce_and_fees(buyer_address)
 
-        print(f"   📤 TX 1/2 (merchant)...")
-        recipient_clean = recipient.replace('0x', '').lower()
-        recipient_bytes = bytes.fromhex(recipient_clean).rjust(32, b'\x00')
-
-        merchant_data = transfer_function_signature + recipient_bytes + merchant_amount_atomic.to_bytes(32, byteorder='big')
+        merchant_data = _encode_transfer(_pad_address(recipient), merchant_amount_atomic)
 
         merchant_tx = {
             'nonce': nonce,
             'to': config.token_contract,
             'value': 0,
             'gas': 100000,
-            'gasPrice': web3.eth.gas_price,
+            'type': 2,
+            'maxFeePerGas': max_fee,
+            'maxPriorityFeePerGas': priority_fee,
             'data': merchant_data,
             'chainId': config.chain_id
         }
 
-        signed_merchant_tx = buyer_account.sign_transaction(merchant_tx)
-        tx_hash_merchant_raw = web3.eth.send_raw_transaction(signed_merchant_tx.raw_transaction)
-        tx_hash_merchant = f"0x{tx_hash_merchant_raw.hex()}" if not tx_hash_merchant_raw.hex().startswith('0x') else tx_hash_merchant_raw.hex()
-        print(f"   ✅ TX 1/2 sent: {tx_hash_merchant[:20]}...")
-
-        print(f"   📤 TX 2/2 (commission)...")
-        commission_addr_clean = commission_address.replace('0x', '').lower()
-        commission_addr_bytes = bytes.fromhex(commission_addr_clean).rjust(32, b'\x00')
-
-        commission_data = transfer_function_signature + commission_addr_bytes + commission_amount_atomic.to_bytes(32, byteorder='big')
+        commission_data = _encode_transfer(commission_address_word, commission_amount_atomic)
 
         commission_tx = {
             'nonce': nonce + 1,
             'to': config.token_contract,
             'value': 0,
             'gas': 100000,
-            'gasPrice': web3.eth.gas_price,
+            'type': 2,
+            'maxFeePerGas': max_fee,
+            'maxPriorityFeePerGas': priority_fee,
             'data': commission_data,
             'chainId': config.chain_id
         }
 
+        # Sign both up front so they can be broadcast in one JSON-RPC batch
+        signed_merchant_tx = buyer_account.sign_transaction(merchant_tx)
         signed_commission_tx = buyer_account.sign_transaction(commission_tx)
-        tx_hash_commission_raw = web3.eth.send_raw_transaction(signed_commission_tx.raw_transaction)
-        tx_hash_commission = f"0x{tx_hash_commission_raw.hex()}" if not tx_hash_commission_raw.hex().startswith('0x') else tx_hash_commission_raw.hex()
+
+        print(f"   📤 Broadcasting TX 1/2 (merchant) + TX 2/2 (commission)...")
+        tx_hash_merchant, tx_hash_commission = send_raw_transactions([
+            signed_merchant_tx.raw_transaction,
+            signed_commission_tx.raw_transaction
+        ])
+        print(f"   ✅ TX 1/2 sent: {tx_hash_merchant[:20]}...")
         print(f"   ✅ TX 2/2 sent: {tx_hash_commission[:20]}...")
 
         global merchant_tx_hash, commission_tx_hash, signed_amount_usd
@@ -306,13 +498,15 @@ def submit_and_verify_payment(payment_data: str) -> str:
 
         print(f"\n📤 Submitting to gateway...")
 
+        # The gateway settles by verifying both on-chain transfers by hash - it does not
+        # accept off-chain transferWithAuthorization signatures, so two txs are required
         payment_payload = {
             "scheme": "eip3009",
             "tx_hash": merchant_tx,
             "tx_hash_commission": commission_tx
         }
 
-        payment_b64 = base64.b64encode(json.dumps(payment_payload).encode()).decode()
+        payment_b64 = base64.b64encode(json_dumps(payment_payload)).decode()
 
         headers = {
             "x-api-key": BUYER_API_KEY,
@@ -320,43 +514,52 @@ def submit_and_verify_payment(payment_data: str) -> str:
             "x-payment": payment_b64
         }
 
-        url = f"{AGENTPAY_API_URL}/x402/resource?chain={config.chain}&token={config.token}&price_usd={price_usd}"
-        response = requests.get(url, headers=headers)
+        url = f"{x402_url_prefix}{price_usd}"
+        response = http_session.get(url, headers=headers, timeout=SETTLEMENT_TIMEOUT)
 
         if response.status_code >= 400:
-            result = response.json() if response.text else {}
+            result = json_loads(response.content) if response.text else {}
             error = result.get('error', response.text)
             print(f"❌ Gateway error ({response.status_code}): {error}")
             return f"Failed: {error}"
 
-        result = response.json()
+        result = json_loads(response.content)
 
         # Check if payment was successful
         if result.get('message') or result.get('success') or result.get('paid') or result.get('status') == 'confirmed':
             print(f"✅ Payment recorded")
 
-            # Verify mandate to get updated budget
-            print(f"   🔍 Fetching updated budget...")
-            verify_response = requests.post(
-                f"{AGENTPAY_API_URL}/mandates/verify",
-                headers={"x-api-key": BUYER_API_KEY, "Content-Type": "application/json"},
-                json={"mandate_token": mandate_token}
-            )
+            # Newer gateways return the remaining budget with the payment result -
+            # only fall back to a separate verify round-trip when it is absent
+            new_budget = result.get('budget_remaining')
+            if new_budget is None:
+                mandate = result.get('mandate')
+                new_budget = mandate.get('budget_remaining') if isinstance(mandate, dict) else None
 
-            if verify_response.status_code == 200:
-                verify_data = verify_response.json()
-                new_budget = verify_data.get('budget_remaining', 'Unknown')
-                print(f"   ✅ Budget updated: ${new_budget}")
+            if new_budget is None:
+                print(f"   🔍 Fetching updated budget...")
+                verify_response = http_session.post(
+                    MANDATES_VERIFY_URL,
+                    headers=GATEWAY_JSON_HEADERS,
+                    json={"mandate_token": mandate_token},
+                    timeout=HTTP_TIMEOUT
+                )
 
-                if current_mandate:
-                    current_mandate['budget_remaining'] = new_budget
-                    agent_id = f"research-assistant-{buyer_account.address}"
-                    save_mandate(agent_id, current_mandate)
+                if verify_response.status_code != 200:
+                    print(f"   ⚠️  Could not fetch updated budget")
+                    return f"Success! Paid: ${price_usd}"
 
-                return f"Success! Paid: ${price_usd}, Remaining: ${new_budget}"
-            else:
-                print(f"   ⚠️  Could not fetch updated budget")
-                return f"Success! Paid: ${price_usd}"
+                new_budget = json_loads(verify_response.content).get('budget_remaining', 'Unknown')
+
+            print(f"   ✅ Budget updated: ${new_budget}")
+
+            if current_mandate:
+                current_mandate['budget_remaining'] = new_budget
+                current_mandate['budget_verified_at'] = time.time()
+                save_mandate(agent_id, current_mandate)
+                _get_live_mandate.cache_clear()
+
+            return f"Success! Paid: ${price_usd}, Remaining: ${new_budget}"
 
         else:
             error = result.get('error', 'Unknown error')
@@ -368,38 +571,12 @@ def submit_and_verify_payment(payment_data: str) -> str:
         return f"Error: {str(e)}"
 
 
-# Define LangChain tools
-tools = [
-    Tool(
-        name="issue_mandate",
-        func=issue_payment_mandate,
-        description="Issue an AP2 payment mandate with a specified budget in USD. Use this FIRST before making any payments. Input should be a float representing the budget amount."
-    ),
-    Tool(
-        name="sign_payment",
-        func=sign_blockchain_payment,
-        description="Sign and execute a blockchain payment on the configured network and token. Creates two transactions: merchant payment and gateway commission. Input should be 'amount_usd,recipient_address'."
-    ),
-    Tool(
-        name="submit_payment",
-        func=submit_and_verify_payment,
-        description="Submit payment proof to AgentGatePay gateway for verification and budget tracking. Input should be 'merchant_tx,commission_tx,mandate_token,price_usd'."
-    ),
-]
-
 # ========================================
 # CREATE AGENT (LangChain 1.x)
 # ========================================
 
-# Initialize LLM
-llm = ChatOpenAI(
-    model="gpt-4",
-    temperature=0,
-    openai_api_key=os.getenv('OPENAI_API_KEY')
-)
-
 # System prompt for agent behavior
-system_prompt = """You are an autonomous AI agent that can make blockchain payments for resources.
+SYSTEM_PROMPT = """You are an autonomous AI agent that can make blockchain payments for resources.
 
 Follow this workflow:
 1. Issue a payment mandate with the specified budget using the issue_mandate tool
@@ -419,18 +596,79 @@ IMPORTANT:
 - If any tool returns an error, STOP immediately and report the error
 - Do NOT retry failed operations"""
 
-# Create LangChain agent
-agent_executor = create_agent(
-    llm,
-    tools,
-    system_prompt=system_prompt
-)
+
+def build_agent():
+    """Create the LangChain agent (LangChain is imported here to keep startup fast)"""
+    from langchain_core.tools import Tool
+    from langchain.agents import create_agent
+    from langchain_openai import ChatOpenAI
+
+    # Define LangChain tools
+    tools = [
+        Tool(
+            name="issue_mandate",
+            func=issue_payment_mandate,
+            description="Issue an AP2 payment mandate with a specified budget in USD. Use this FIRST before making any payments. Input should be a float representing the budget amount."
+        ),
+        Tool(
+            name="sign_payment",
+            func=sign_blockchain_payment,
+            description="Sign and execute a blockchain payment on the configured network and token. Creates two transactions: merchant payment and gateway commission. Input should be 'amount_usd,recipient_address'."
+        ),
+        Tool(
+            name="submit_payment",
+            func=submit_and_verify_payment,
+            description="Submit payment proof to AgentGatePay gateway for verification and budget tracking. Input should be 'merchant_tx,commission_tx,mandate_token,price_usd'."
+        ),
+    ]
+
+    # Initialize LLM
+    llm = ChatOpenAI(
+        model="gpt-4o-mini",
+        temperature=0,
+        openai_api_key=os.getenv('OPENAI_API_KEY')
+    )
+
+    return create_agent(
+        llm,
+        tools,
+        system_prompt=SYSTEM_PROMPT
+    )
+
+def run_payment_workflow(budget_usd: float, price_usd: float, recipient: str) -> str:
+    """
+    Run issue mandate -> sign -> submit directly, without an LLM in the loop.
+
+    The workflow is fixed (SYSTEM_PROMPT prescribes it step by step), so calling
+    the tools in order gives the same result without three LLM round-trips.
+    """
+    mandate_result = issue_payment_mandate(budget_usd)
+    if not mandate_result.startswith("MANDATE_TOKEN:"):
+        return mandate_result
+    mandate_token = mandate_result.split(':', 1)[1]
+
+    payment_result = sign_blockchain_payment(f"{price_usd},{recipient}")
+    if not payment_result.startswith("TX_HASHES:"):
+        return payment_result
+    merchant_tx, commission_tx = payment_result.split(':', 1)[1].split(',')
+
+    return submit_and_verify_payment(f"{merchant_tx},{commission_tx},{mandate_token},{price_usd}")
 
 # ========================================
 # EXECUTE PAYMENT WORKFLOW
 # ========================================
 
 if __name__ == "__main__":
+    # Fail fast on missing configuration, before paying for heavy imports
+    missing = [name for name in ('BUYER_API_KEY', 'BUYER_PRIVATE_KEY', 'SELLER_WALLET') if not os.getenv(name)]
+    if missing:
+        print(f"❌ ERROR: {', '.join(missing)} not configured in .env")
+        print("   See .env.example for the required settings")
+        exit(1)
+
+    from eth_account import Account
+    from agentgatepay_sdk import AgentGatePay
+
     print("=" * 80)
     print("AGENTGATEPAY + LANGCHAIN: BASIC PAYMENT DEMO (REST API)")
     print("=" * 80)
@@ -447,6 +685,7 @@ if __name__ == "__main__":
     print("=" * 80)
 
     config = get_chain_config()
+    x402_url_prefix = f"{AGENTPAY_API_URL}/x402/resource?chain={config.chain}&token={config.token}&price_usd="
 
     print(f"\nUsing configuration from .env:")
     print(f"  Chain: {config.chain.title()} (ID: {config.chain_id})")
@@ -461,33 +700,18 @@ if __name__ == "__main__":
         api_url=AGENTPAY_API_URL,
         api_key=BUYER_API_KEY
     )
-    web3 = Web3(Web3.HTTPProvider(config.rpc_url))
     buyer_account = Account.from_key(BUYER_PRIVATE_KEY)
+    buyer_address = buyer_account.address
 
     print(f"\nInitialized AgentGatePay client: {AGENTPAY_API_URL}")
-    print(f"Initialized Web3 client: {config.chain.title()} network")
-    print(f"Buyer wallet: {buyer_account.address}\n")
+    print(f"Using RPC: {config.chain.title()} network")
+    print(f"Buyer wallet: {buyer_address}\n")
 
-    agent_id = f"research-assistant-{buyer_account.address}"
-    existing_mandate = get_mandate(agent_id)
+    agent_id = f"research-assistant-{buyer_address}"
+    existing_mandate = _get_live_mandate(agent_id)
 
     if existing_mandate:
-        token = existing_mandate.get('mandate_token')
-
-        # Get LIVE budget from gateway (not JWT which is static)
-        verify_response = requests.post(
-            f"{AGENTPAY_API_URL}/mandates/verify",
-            headers={"x-api-key": BUYER_API_KEY, "Content-Type": "application/json"},
-            json={"mandate_token": token}
-        )
-
-        if verify_response.status_code == 200:
-            verify_data = verify_response.json()
-            budget_remaining = verify_data.get('budget_remaining', 'Unknown')
-        else:
-            token_data = decode_mandate_token(token)
-            budget_remaining = token_data.get('budget_remaining', 'Unknown')
-
+        budget_remaining = existing_mandate['budget_remaining']
         print(f"\n♻️  Using existing mandate (Budget: ${budget_remaining})")
         print(f"   Token: {existing_mandate.get('mandate_token', 'N/A')[:50]}...")
         print(f"   To delete: rm ../.agentgatepay_mandates.json\n")
@@ -499,32 +723,39 @@ if __name__ == "__main__":
         purpose = input("📝 Enter payment purpose (default: research resource): ").strip()
         purpose = purpose if purpose else "research resource"
 
-    # Agent task
-    task = f"""
-    Purchase a {purpose} for ${RESOURCE_PRICE_USD} USD.
-
-    Steps:
-    1. Issue a payment mandate with a ${mandate_budget} budget (or reuse existing)
-    2. Sign blockchain payment of ${RESOURCE_PRICE_USD} to seller: {SELLER_WALLET}
-    3. Submit payment proof to AgentGatePay with mandate token
-
-    The mandate token and transaction hashes will be available after steps 1 and 2.
-    """
+    # Set AGENTPAY_USE_LLM=1 to let the LangChain agent drive the tools instead
+    use_llm = os.getenv('AGENTPAY_USE_LLM') == '1'
 
     try:
-        # Run agent (LangGraph format expects messages)
-        result = agent_executor.invoke({"messages": [("user", task)]})
+        if use_llm:
+            # Agent task
+            task = f"""
+            Purchase a {purpose} for ${RESOURCE_PRICE_USD} USD.
+
+            Steps:
+            1. Issue a payment mandate with a ${mandate_budget} budget (or reuse existing)
+            2. Sign blockchain payment of ${RESOURCE_PRICE_USD} to seller: {SELLER_WALLET}
+            3. Submit payment proof to AgentGatePay with mandate token
+
+            The mandate token and transaction hashes will be available after steps 1 and 2.
+            """
+
+            # Run agent (LangGraph format expects messages)
+            agent_executor = build_agent()
+            result = agent_executor.invoke({"messages": [("user", task)]})
+
+            # Extract final message from LangGraph response
+            if "messages" in result:
+                final_message = result["messages"][-1].content if result["messages"] else "No output"
+            else:
+                final_message = result
+        else:
+            final_message = run_payment_workflow(mandate_budget, RESOURCE_PRICE_USD, SELLER_WALLET)
 
         print("\n" + "=" * 80)
         print("PAYMENT WORKFLOW COMPLETED")
         print("=" * 80)
-
-        # Extract final message from LangGraph response
-        if "messages" in result:
-            final_message = result["messages"][-1].content if result["messages"] else "No output"
-            print(f"\nResult: {final_message}")
-        else:
-            print(f"\nResult: {result}")
+        print(f"\nResult: {final_message}")
 
         # Display final status
         if current_mandate:
@@ -540,10 +771,10 @@ if __name__ == "__main__":
             # Display gateway audit logs with curl commands
             print(f"\nGateway Audit Logs (copy-paste these commands):")
             print(f"\n# All payment logs (by wallet):")
-            print(f"curl '{AGENTPAY_API_URL}/audit/logs?client_id={buyer_account.address}&event_type=x402_payment_settled&limit=10' \\")
+            print(f"curl '{AGENTPAY_API_URL}/audit/logs?client_id={buyer_address}&event_type=x402_payment_settled&limit=10' \\")
             print(f"  -H 'x-api-key: {BUYER_API_KEY}' | python3 -m json.tool")
             print(f"\n# Recent payments (24h):")
-            print(f"curl '{AGENTPAY_API_URL}/audit/logs?client_id={buyer_account.address}&event_type=x402_payment_settled&hours=24' \\")
+            print(f"curl '{AGENTPAY_API_URL}/audit/logs?client_id={buyer_address}&event_type=x402_payment_settled&hours=24' \\")
             print(f"  -H 'x-api-key: {BUYER_API_KEY}' | python3 -m json.tool")
             print(f"\n# Payment verification (by tx_hash):")
             print(f"curl '{AGENTPAY_API_URL}/v1/payments/verify/{merchant_tx_hash}' \\")
@@ -31,18 +31,33 @@ For MCP Version: See Example 3b (MCP + external signing)
 """
 
 import os
+import re
+import atexit
 import sys
+import time
 import json
 import base64
+import functools
+from decimal import Decimal
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Dict, Any
 from dotenv import load_dotenv
-from agentgatepay_sdk import AgentGatePay
 
-# LangChain imports (updated for LangChain 1.x)
-from langchain_core.tools import Tool
-from langchain.agents import create_agent
-from langchain_openai import ChatOpenAI
+# orjson is optional - faster JSON for gateway and signing-service payloads, stdlib fallback
+try:
+    import orjson
+    json_dumps = orjson.dumps
+    json_loads = orjson.loads
+except ImportError:
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(',', ':')).encode()
+    json_loads = json.loads
+
+# Heavy imports (agentgatepay_sdk, LangChain) are deferred until configuration
+# has been validated - see build_agent() and __main__
 
 # Add parent directory to path for utils import
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
@@ -88,50 +103,112 @@ TX_SIGNING_SERVICE = os.getenv('TX_SIGNING_SERVICE')
 RESOURCE_PRICE_USD = 0.01
 MANDATE_BUDGET_USD = 100.0
 
+# 32-byte transaction hash as 0x-prefixed hex
+TX_HASH_RE = re.compile(r'0x[0-9a-fA-F]{64}')
+
 # Multi-chain/token configuration (set after interactive selection)
 config = None  # Will be set via get_chain_config() in main()
-
-# Validate configuration
-if not TX_SIGNING_SERVICE:
-    print("❌ ERROR: TX_SIGNING_SERVICE not configured in .env")
-    print("   Please set TX_SIGNING_SERVICE=http://localhost:3000 (Docker)")
-    print("   Or: TX_SIGNING_SERVICE=https://your-service.onrender.com (Render)")
-    print("   See docs/TX_SIGNING_OPTIONS.md for setup instructions")
-    exit(1)
+x402_url_prefix = None  # Resource URL up to price_usd= - chain/token are fixed per run
+agent_id = f"research-assistant-{BUYER_WALLET}"  # Mandate subject for this buyer
 
 # ========================================
 # INITIALIZE CLIENTS
 # ========================================
-
-agentpay = AgentGatePay(
-    api_url=AGENTPAY_API_URL,
-    api_key=BUYER_API_KEY
+# Note: AgentGatePay client initialized in main() after configuration is validated
+
+agentpay = None
+
+# Shared HTTP session for the agent tools - keep-alive reuses the TCP/TLS
+# connections to the gateway and the signing service across calls.
+# Both hosts authenticate with the buyer API key, so it is a session default.
+HTTP_TIMEOUT = (3.05, 30)  # (connect, read) seconds for gateway calls
+SETTLEMENT_TIMEOUT = (3.05, 120)  # x402 settlement may wait for on-chain confirmation
+SIGNING_TIMEOUT = (3.05, 120)  # Signing service sends both transactions before replying
+JSON_HEADERS = {"Content-Type": "application/json"}
+http_session = requests.Session()
+http_session.headers.update({"x-api-key": BUYER_API_KEY})
+_adapter = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    # read=0: never resend a request the gateway may still be processing - a
+    # timed-out settlement would otherwise submit the payment proof again
+    max_retries=Retry(total=2, read=0, backoff_factor=0.2, status_forcelist=[502, 503, 504])
 )
-
-print(f"✅ Initialized AgentGatePay client: {AGENTPAY_API_URL}")
-print(f"✅ Configured TX signing service: {TX_SIGNING_SERVICE}")
-print(f"✅ Buyer wallet: {BUYER_WALLET}")
-print(f"✅ PRODUCTION MODE: Private key NOT in application code\n")
+http_session.mount("https://", _adapter)
+http_session.mount("http://", _adapter)  # Local Docker signing service
 
 # ========================================
 # HELPER FUNCTIONS
 # ========================================
 
+@functools.lru_cache(maxsize=256)
 def decode_mandate_token(token: str) -> dict:
     """Decode AP2 mandate token to extract payload"""
+    # Pure function of the token string - cached since the same token is decoded repeatedly per run.
+    # Callers must treat the returned dict as read-only.
     try:
-        parts = token.split('.')
-        if len(parts) != 3:
+        # Locate the payload between the two dots without splitting the whole token
+        i = token.find('.')
+        j = token.find('.', i + 1)
+        if i < 0 or j < 0 or token.find('.', j + 1) >= 0:
             return {}
-        payload_b64 = parts[1]
-        padding = 4 - (len(payload_b64) % 4)
-        if padding != 4:
-            payload_b64 += '=' * padding
-        payload_json = base64.urlsafe_b64decode(payload_b64)
-        return json.loads(payload_json)
-    except:
+        payload_b64 = token[i + 1:j]
+        return json_loads(base64.urlsafe_b64decode(payload_b64 + '=' * (-len(payload_b64) % 4)))
+    except Exception:
         return {}
 
+# Verify responses are stable for a few seconds - reuse them within a run
+MANDATE_VERIFY_TTL_SECONDS = 30
+_verify_cache = {}  # mandate_token -> (verify_data, monotonic expiry)
+
+def verify_mandate(token: str) -> dict:
+    """Fetch live mandate state from /mandates/verify (cached per token, None on failure)"""
+    cached = _verify_cache.get(token)
+    if cached and time.monotonic() < cached[1]:
+        return cached[0]
+
+    response = http_session.post(
+        f"{AGENTPAY_API_URL}/mandates/verify",
+        data=json_dumps({"mandate_token": token}),
+        headers=JSON_HEADERS,
+        timeout=HTTP_TIMEOUT
+    )
+    if response.status_code != 200:
+        return None
+
+    data = json_loads(response.content)
+
+    # Never serve a cached answer past the token's own expiry
+    ttl = MANDATE_VERIFY_TTL_SECONDS
+    exp = decode_mandate_token(token).get('exp')
+    if exp is not None:
+        ttl = min(ttl, exp - time.time() - 5)
+    if ttl > 0:
+        _verify_cache[token] = (data, time.monotonic() + ttl)
+
+    return data
+
+def get_budget_remaining(token: str, verify_data: dict = None, default='Unknown'):
+    """Live budget for a mandate token, falling back to the JWT payload when verify fails"""
+    if verify_data is None:
+        verify_data = verify_mandate(token)
+    if verify_data is not None:
+        return verify_data.get('budget_remaining', 'Unknown')
+    return decode_mandate_token(token).get('budget_remaining', default)
+
+# Mandate file writes run on a single background worker (so they stay in
+# order) instead of on the tool's return path; flushed at interpreter exit
+_save_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='mandate-save')
+atexit.register(_save_executor.shutdown, wait=True)
+
+def _report_save_error(future):
+    if future.exception() is not None:
+        print(f"⚠️  Could not save mandate: {future.exception()}")
+
+def save_mandate_in_background(agent_id: str, mandate: dict):
+    """Queue a save_mandate() call with a snapshot of the mandate"""
+    _save_executor.submit(save_mandate, agent_id, dict(mandate)).add_done_callback(_report_save_error)
+
 # ========================================
 # AGENT TOOLS
 # ========================================
@@ -146,25 +223,13 @@ def issue_payment_mandate(budget_usd: float) -> str:
     global current_mandate
 
     try:
-        agent_id = f"research-assistant-{BUYER_WALLET}"
         existing_mandate = get_mandate(agent_id)
 
         if existing_mandate:
             token = existing_mandate.get('mandate_token')
 
             # Get LIVE budget from gateway
-            verify_response = requests.post(
-                f"{AGENTPAY_API_URL}/mandates/verify",
-                headers={"x-api-key": BUYER_API_KEY, "Content-Type": "application/json"},
-                json={"mandate_token": token}
-            )
-
-            if verify_response.status_code == 200:
-                verify_data = verify_response.json()
-                budget_remaining = verify_data.get('budget_remaining', 'Unknown')
-            else:
-                token_data = decode_mandate_token(token)
-                budget_remaining = token_data.get('budget_remaining', existing_mandate.get('budget_usd', 'Unknown'))
+            budget_remaining = get_budget_remaining(token, default=existing_mandate.get('budget_usd', 'Unknown'))
 
             print(f"\n♻️  Reusing mandate (Budget: ${budget_remaining})")
             current_mandate = existing_mandate
@@ -189,7 +254,7 @@ def issue_payment_mandate(budget_usd: float) -> str:
         }
 
         current_mandate = mandate_with_budget
-        save_mandate(agent_id, mandate_with_budget)
+        save_mandate_in_background(agent_id, mandate_with_budget)
 
         print(f"✅ Mandate created (Budget: ${budget_usd})")
 
@@ -227,7 +292,8 @@ def sign_payment_via_service(payment_input: str) -> str:
         recipient = parts[1].strip()
 
         # Convert USD to atomic units
-        amount_atomic = int(amount_usd * (10 ** config.decimals))
+        # Scale via Decimal: float * 10**18 drifts for DAI (0.57 -> 569999999999999936)
+        amount_atomic = int(Decimal(parts[0].strip()) * config.atomic_multiplier)
 
         print(f"\n💳 Requesting payment signature from external service...")
         print(f"   Amount: ${amount_usd} {config.token} ({amount_atomic} atomic units)")
@@ -236,19 +302,16 @@ def sign_payment_via_service(payment_input: str) -> str:
         print(f"   Service: {TX_SIGNING_SERVICE}")
 
         # Call external signing service
-        response = requests.post(
+        response = http_session.post(
             f"{TX_SIGNING_SERVICE}/sign-payment",
-            headers={
-                "Content-Type": "application/json",
-                "x-api-key": BUYER_API_KEY
-            },
-            json={
+            data=json_dumps({
                 "merchant_address": recipient,
                 "total_amount": str(amount_atomic),
                 "chain": config.chain,
                 "token": config.token
-            },
-            timeout=120
+            }),
+            headers=JSON_HEADERS,
+            timeout=SIGNING_TIMEOUT
         )
 
         if response.status_code != 200:
@@ -256,7 +319,7 @@ def sign_payment_via_service(payment_input: str) -> str:
             print(f"❌ {error_msg}")
             return error_msg
 
-        result = response.json()
+        result = json_loads(response.content)
 
         # Extract transaction hashes
         merchant_tx_hash = result.get('tx_hash')
@@ -273,39 +336,43 @@ def sign_payment_via_service(payment_input: str) -> str:
         print(f"   Status: {'Success' if result.get('success') else 'Failed'}")
 
         # Verify hashes have correct format
-        if len(merchant_tx_hash) != 66 or not merchant_tx_hash.startswith('0x'):
+        if not TX_HASH_RE.fullmatch(merchant_tx_hash):
             error_msg = f"Invalid merchant tx_hash format from service: {merchant_tx_hash}"
             print(f"❌ {error_msg}")
             return error_msg
 
-        if len(commission_tx_hash) != 66 or not commission_tx_hash.startswith('0x'):
+        if not TX_HASH_RE.fullmatch(commission_tx_hash):
             error_msg = f"Invalid commission tx_hash format from service: {commission_tx_hash}"
             print(f"❌ {error_msg}")
             return error_msg
 
         return f"TX_HASHES:{merchant_tx_hash},{commission_tx_hash}"
 
-    except requests.exceptions.Timeout:
-        error_msg = f"Signing service timeout (exceeded 120s)"
-        print(f"❌ {error_msg}")
-        return error_msg
-
-    except requests.exceptions.ConnectionError:
-        error_msg = f"Cannot connect to signing service at {TX_SIGNING_SERVICE}"
-        print(f"❌ {error_msg}")
-        print(f"   Check: curl {TX_SIGNING_SERVICE}/health")
-        return error_msg
-
     except Exception as e:
-        error_msg = f"Payment signing failed: {str(e)}"
+        # ConnectTimeout is both a ConnectionError and a Timeout - report it as a connection problem
+        if isinstance(e, requests.exceptions.ConnectionError):
+            error_msg = f"Cannot connect to signing service at {TX_SIGNING_SERVICE}"
+            hint = f"   Check: curl {TX_SIGNING_SERVICE}/health"
+        elif isinstance(e, requests.exceptions.Timeout):
+            error_msg = f"Signing service timeout (exceeded {SIGNING_TIMEOUT[1]}s)"
+            hint = None
+        else:
+            error_msg = f"Payment signing failed: {str(e)}"
+            hint = None
+
         print(f"❌ {error_msg}")
+        if hint:
+            print(hint)
         return error_msg
 
 
 def submit_and_verify_payment(payment_data: str) -> str:
-    """Submit payment proof and verify budget (matches Script 1)"""
-    global current_mandate
+    """
+    Submit payment proof and verify budget (matches Script 1)
 
+    Reads the post-payment budget_remaining from the x402 response (top level
+    or under "mandate") and only calls /mandates/verify when the gateway omits it.
+    """
     try:
         parts = payment_data.split(',')
         if len(parts) != 4:
@@ -324,46 +391,50 @@ def submit_and_verify_payment(payment_data: str) -> str:
             "tx_hash_commission": commission_tx
         }
 
-        payment_b64 = base64.b64encode(json.dumps(payment_payload).encode()).decode()
+        payment_b64 = base64.b64encode(json_dumps(payment_payload)).decode()
 
         headers = {
-            "x-api-key": BUYER_API_KEY,
             "x-mandate": mandate_token,
             "x-payment": payment_b64
         }
 
-        url = f"{AGENTPAY_API_URL}/x402/resource?chain={config.chain}&token={config.token}&price_usd={price_usd}"
-        response = requests.get(url, headers=headers)
+        url = f"{x402_url_prefix}{price_usd}"
+        response = http_session.get(url, headers=headers, timeout=SETTLEMENT_TIMEOUT)
 
         if response.status_code >= 400:
-            result = response.json() if response.text else {}
+            result = json_loads(response.content) if response.content else {}
             error = result.get('error', response.text)
             print(f"❌ Gateway error ({response.status_code}): {error}")
             return f"Failed: {error}"
 
-        result = response.json()
+        result = json_loads(response.content)
 
         # Check if payment was successful
         if result.get('message') or result.get('success') or result.get('paid') or result.get('status') == 'confirmed':
             print(f"✅ Payment recorded")
 
-            # Verify mandate to get updated budget
-            print(f"   🔍 Fetching updated budget...")
-            verify_response = requests.post(
-                f"{AGENTPAY_API_URL}/mandates/verify",
-                headers={"x-api-key": BUYER_API_KEY, "Content-Type": "application/json"},
-                json={"mandate_token": mandate_token}
-            )
-
-            if verify_response.status_code == 200:
-                verify_data = verify_response.json()
-                new_budget = verify_data.get('budget_remaining', 'Unknown')
+            # Newer gateways return the remaining budget with the payment result -
+            # only fall back to a separate verify round-trip when it is absent
+            new_budget = result.get('budget_remaining')
+            if new_budget is None:
+                mandate = result.get('mandate')
+                new_budget = mandate.get('budget_remaining') if isinstance(mandate, dict) else None
+            # Either way the cached pre-payment verify answer is now stale
+            _verify_cache.pop(mandate_token, None)
+            if new_budget is None:
+                print(f"   🔍 Fetching updated budget...")
+                verify_data = verify_mandate(mandate_token)
+                if verify_data is not None:
+                    new_budget = verify_data.get('budget_remaining', 'Unknown')
+
+            if new_budget is not None:
                 print(f"   ✅ Budget updated: ${new_budget}")
 
-                if current_mandate:
-                    current_mandate['budget_remaining'] = new_budget
-                    agent_id = f"research-assistant-{BUYER_WALLET}"
-                    save_mandate(agent_id, current_mandate)
+                # Read the global once; the mandate dict itself is updated in place
+                mandate = current_mandate
+                if mandate:
+                    mandate['budget_remaining'] = new_budget
+                    save_mandate_in_background(agent_id, mandate)
 
                 return f"Success! Paid: ${price_usd}, Remaining: ${new_budget}"
             else:
@@ -380,38 +451,12 @@ def submit_and_verify_payment(payment_data: str) -> str:
         return f"Error: {str(e)}"
 
 
-# Define LangChain tools
-tools = [
-    Tool(
-        name="issue_mandate",
-        func=issue_payment_mandate,
-        description="Issue an AP2 payment mandate with a specified budget in USD. Use this FIRST before making any payments. Input should be a float representing the budget amount."
-    ),
-    Tool(
-        name="sign_payment",
-        func=sign_payment_via_service,
-        description="Sign and execute a blockchain payment via external signing service (PRODUCTION). Creates two transactions: merchant payment and gateway commission. Input should be 'amount_usd,recipient_address'."
-    ),
-    Tool(
-        name="submit_payment",
-        func=submit_and_verify_payment,
-        description="Submit payment proof to AgentGatePay gateway for verification and budget tracking. Input should be 'merchant_tx,commission_tx,mandate_token,price_usd'."
-    ),
-]
-
 # ========================================
 # CREATE AGENT (LangChain 1.x)
 # ========================================
 
-# Initialize LLM
-llm = ChatOpenAI(
-    model="gpt-4",
-    temperature=0,
-    openai_api_key=os.getenv('OPENAI_API_KEY')
-)
-
 # System prompt for agent behavior
-system_prompt = """You are an autonomous AI agent that can make blockchain payments for resources.
+SYSTEM_PROMPT = """You are an autonomous AI agent that can make blockchain payments for resources.
 
 Follow this workflow:
 1. Issue a payment mandate with the specified budget using the issue_mandate tool
@@ -432,54 +477,152 @@ IMPORTANT:
 - If any tool returns an error, STOP immediately and report the error
 - Do NOT retry failed operations"""
 
-# Create LangChain agent
-agent_executor = create_agent(
-    llm,
-    tools,
-    system_prompt=system_prompt
-)
+def build_agent():
+    """Create the LangChain agent (LangChain is imported here to keep startup fast)"""
+    from langchain_core.tools import Tool
+    from langchain.agents import create_agent
+    from langchain_openai import ChatOpenAI
+
+    # Define LangChain tools
+    tools = [
+        Tool(
+            name="issue_mandate",
+            func=issue_payment_mandate,
+            description="Issue an AP2 payment mandate with a specified budget in USD. Use this FIRST before making any payments. Input should be a float representing the budget amount."
+        ),
+        Tool(
+            name="sign_payment",
+            func=sign_payment_via_service,
+            description="Sign and execute a blockchain payment via external signing service (PRODUCTION). Creates two transactions: merchant payment and gateway commission. Input should be 'amount_usd,recipient_address'."
+        ),
+        Tool(
+            name="submit_payment",
+            func=submit_and_verify_payment,
+            description="Submit payment proof to AgentGatePay gateway for verification and budget tracking. Input should be 'merchant_tx,commission_tx,mandate_token,price_usd'."
+        ),
+    ]
+
+    # Initialize LLM
+    llm = ChatOpenAI(
+        model="gpt-4o-mini",
+        temperature=0,
+        openai_api_key=os.getenv('OPENAI_API_KEY')
+    )
+
+    return create_agent(
+        llm,
+        tools,
+        system_prompt=SYSTEM_PROMPT
+    )
 
 # ========================================
 # EXECUTE PAYMENT WORKFLOW
 # ========================================
 
+# Console text is written as whole blocks (one write each) rather than line-by-line prints
+BANNER = """\
+{rule}
+AGENTGATEPAY + LANGCHAIN: PRODUCTION TX SIGNING DEMO
+{rule}
+
+This demo shows PRODUCTION-READY autonomous agent payments using:
+  - AgentGatePay REST API (latest SDK)
+  - External transaction signing service (NO private key in code)
+  - LangChain agent framework
+  - Multi-chain blockchain payments (Base/Ethereum/Polygon/Arbitrum)
+  - Multi-token support (USDC/USDT/DAI)
+
+✅ SECURE: Private key stored in signing service, NOT in application
+✅ SCALABLE: Signing service can be deployed independently
+✅ PRODUCTION READY: Suitable for real-world deployments
+
+
+CHAIN & TOKEN CONFIGURATION
+{rule}""".format(rule="=" * 80)
+
+CONFIG_SUMMARY = """
+Using configuration from .env:
+  Chain: {chain_title} (ID: {chain_id})
+  Token: {token} ({decimals} decimals)
+  RPC: {rpc_url}
+  Contract: {token_contract}
+
+To change chain/token: Edit PAYMENT_CHAIN and PAYMENT_TOKEN in .env file
+{rule}"""
+
+AUDIT_COMMANDS = """
+Gateway Audit Logs (copy-paste these commands):
+
+# All payment logs (by wallet):
+curl '{api_url}/audit/logs?client_id={wallet}&event_type=x402_payment_settled&limit=10' \\
+  -H 'x-api-key: {api_key}' | python3 -m json.tool
+
+# Recent payments (24h):
+curl '{api_url}/audit/logs?client_id={wallet}&event_type=x402_payment_settled&hours=24' \\
+  -H 'x-api-key: {api_key}' | python3 -m json.tool
+
+# Payment verification (by tx_hash):
+curl '{api_url}/v1/payments/verify/{tx_hash}' \\
+  -H 'x-api-key: {api_key}' | python3 -m json.tool
+
+✅ PRODUCTION SUCCESS:
+   Private key: SECURE (stored in signing service)
+   Application code: CLEAN (no private keys)
+   Payment: VERIFIED (on {chain_title} blockchain)"""
+
 if __name__ == "__main__":
-    print("=" * 80)
-    print("AGENTGATEPAY + LANGCHAIN: PRODUCTION TX SIGNING DEMO")
-    print("=" * 80)
-    print()
-    print("This demo shows PRODUCTION-READY autonomous agent payments using:")
-    print("  - AgentGatePay REST API (latest SDK)")
-    print("  - External transaction signing service (NO private key in code)")
-    print("  - LangChain agent framework")
-    print("  - Multi-chain blockchain payments (Base/Ethereum/Polygon/Arbitrum)")
-    print("  - Multi-token support (USDC/USDT/DAI)")
-    print()
-    print("✅ SECURE: Private key stored in signing service, NOT in application")
-    print("✅ SCALABLE: Signing service can be deployed independently")
-    print("✅ PRODUCTION READY: Suitable for real-world deployments")
-    print()
+    # Fail fast on missing configuration, before paying for heavy imports
+    if not TX_SIGNING_SERVICE:
+        print("❌ ERROR: TX_SIGNING_SERVICE not configured in .env")
+        print("   Please set TX_SIGNING_SERVICE=http://localhost:3000 (Docker)")
+        print("   Or: TX_SIGNING_SERVICE=https://your-service.onrender.com (Render)")
+        print("   See docs/TX_SIGNING_OPTIONS.md for setup instructions")
+        exit(1)
 
-    # Load chain/token configuration from .env
-    print("\nCHAIN & TOKEN CONFIGURATION")
-    print("=" * 80)
+    from agentgatepay_sdk import AgentGatePay
 
-    config = get_chain_config()
+    agentpay = AgentGatePay(
+        api_url=AGENTPAY_API_URL,
+        api_key=BUYER_API_KEY
+    )
 
-    print(f"\nUsing configuration from .env:")
-    print(f"  Chain: {config.chain.title()} (ID: {config.chain_id})")
-    print(f"  Token: {config.token} ({config.decimals} decimals)")
-    print(f"  RPC: {config.rpc_url}")
-    print(f"  Contract: {config.token_contract}")
-    print(f"\nTo change chain/token: Edit PAYMENT_CHAIN and PAYMENT_TOKEN in .env file")
-    print("=" * 80)
+    print(f"✅ Initialized AgentGatePay client: {AGENTPAY_API_URL}")
+    print(f"✅ Configured TX signing service: {TX_SIGNING_SERVICE}")
+    print(f"✅ Buyer wallet: {BUYER_WALLET}")
+    print(f"✅ PRODUCTION MODE: Private key NOT in application code\n")
+
+    print(BANNER)
+
+    # Load chain/token configuration from .env
+    config = get_chain_config()
+    x402_url_prefix = f"{AGENTPAY_API_URL}/x402/resource?chain={config.chain}&token={config.token}&price_usd="
+
+    print(CONFIG_SUMMARY.format(
+        chain_title=config.chain.title(),
+        chain_id=config.chain_id,
+        token=config.token,
+        decimals=config.decimals,
+        rpc_url=config.rpc_url,
+        token_contract=config.token_contract,
+        rule="=" * 80
+    ))
+
+    def lookup_mandate():
+        mandate = get_mandate(agent_id)
+        return mandate, (get_budget_remaining(mandate['mandate_token']) if mandate else None)
+
+    # Health check and mandate lookup/verify are independent - run them concurrently
+    preflight = ThreadPoolExecutor(max_workers=2)
+    health_future = preflight.submit(http_session.get, f"{TX_SIGNING_SERVICE}/health", timeout=5)
+    mandate_future = preflight.submit(lookup_mandate)
+    preflight.shutdown(wait=False)
 
     # Check signing service health
     print(f"\n🏥 Checking signing service health...")
     try:
-        health_response = requests.get(f"{TX_SIGNING_SERVICE}/health", timeout=5)
+        health_response = health_future.result()
         if health_response.status_code == 200:
-            health_data = health_response.json()
+            health_data = json_loads(health_response.content)
             print(f"✅ Signing service is healthy")
             print(f"   Status: {health_data.get('status', 'N/A')}")
             print(f"   Wallet configured: {health_data.get('wallet_configured', False)}")
@@ -493,25 +636,10 @@ if __name__ == "__main__":
         print(f"   See docs/TX_SIGNING_OPTIONS.md for setup instructions")
         exit(1)
 
-    agent_id = f"research-assistant-{BUYER_WALLET}"
-    existing_mandate = get_mandate(agent_id)
+    # LIVE budget from gateway (verified during preflight)
+    existing_mandate, budget_remaining = mandate_future.result()
 
     if existing_mandate:
-        token = existing_mandate.get('mandate_token')
-
-        # Get LIVE budget from gateway
-        verify_response = requests.post(
-            f"{AGENTPAY_API_URL}/mandates/verify",
-            headers={"x-api-key": BUYER_API_KEY, "Content-Type": "application/json"},
-            json={"mandate_token": token}
-        )
-
-        if verify_response.status_code == 200:
-            verify_data = verify_response.json()
-            budget_remaining = verify_data.get('budget_remaining', 'Unknown')
-        else:
-            token_data = decode_mandate_token(token)
-            budget_remaining = token_data.get('budget_remaining', 'Unknown')
 
         print(f"\n♻️  Using existing mandate (Budget: ${budget_remaining})")
         print(f"   Token: {existing_mandate.get('mandate_token', 'N/A')[:50]}...")
@@ -539,6 +667,7 @@ if __name__ == "__main__":
 
     try:
         # Run agent (LangGraph format expects messages)
+        agent_executor = build_agent()
         result = agent_executor.invoke({"messages": [("user", task)]})
 
         print("\n" + "=" * 80)
@@ -564,21 +693,13 @@ if __name__ == "__main__":
             print(f"  Commission TX: {config.explorer}/tx/{commission_tx_hash}")
 
             # Display gateway audit logs with curl commands
-            print(f"\nGateway Audit Logs (copy-paste these commands):")
-            print(f"\n# All payment logs (by wallet):")
-            print(f"curl '{AGENTPAY_API_URL}/audit/logs?client_id={BUYER_WALLET}&event_type=x402_payment_settled&limit=10' \\")
-            print(f"  -H 'x-api-key: {BUYER_API_KEY}' | python3 -m json.tool")
-            print(f"\n# Recent payments (24h):")
-            print(f"curl '{AGENTPAY_API_URL}/audit/logs?client_id={BUYER_WALLET}&event_type=x402_payment_settled&hours=24' \\")
-            print(f"  -H 'x-api-key: {BUYER_API_KEY}' | python3 -m json.tool")
-            print(f"\n# Payment verification (by tx_hash):")
-            print(f"curl '{AGENTPAY_API_URL}/v1/payments/verify/{merchant_tx_hash}' \\")
-            print(f"  -H 'x-api-key: {BUYER_API_KEY}' | python3 -m json.tool")
-
-            print(f"\n✅ PRODUCTION SUCCESS:")
-            print(f"   Private key: SECURE (stored in signing service)")
-            print(f"   Application code: CLEAN (no private keys)")
-            print(f"   Payment: VERIFIED (on {config.chain.title()} blockchain)")
+            print(AUDIT_COMMANDS.format(
+                api_url=AGENTPAY_API_URL,
+                wallet=BUYER_WALLET,
+                api_key=BUYER_API_KEY,
+                tx_hash=merchant_tx_hash,
+                chain_title=config.chain.title()
+            ))
 
     except KeyboardInterrupt:
         print("\n\n⚠️  Demo interrupted by user")
@@ -26,20 +26,36 @@ Requirements:
 """
 
 import os
+import re
 import sys
 import time
 import json
 import base64
+import functools
+from decimal import Decimal
 import requests
 import threading
-from typing import Dict, Any
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from dataclasses import dataclass
+from typing import Dict, Any, Optional
 from dotenv import load_dotenv
 from web3 import Web3
 from eth_account import Account
 from agentgatepay_sdk import AgentGatePay
 
+# orjson is optional - faster JSON for seller, gateway and RPC payloads, stdlib fallback
+try:
+    import orjson
+    json_dumps = orjson.dumps
+    json_loads = orjson.loads
+except ImportError:
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(',', ':')).encode()
+    json_loads = json.loads
+
 # LangChain imports (LangChain 1.x compatible)
-from langchain_core.tools import Tool, StructuredTool
+from langchain_core.tools import StructuredTool
 from langchain.agents import create_agent
 from langchain_openai import ChatOpenAI
 
@@ -47,10 +63,10 @@ from langchain_openai import ChatOpenAI
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 # Utils for mandate storage
-from utils import save_mandate, get_mandate, clear_mandate
+from utils import save_mandate, get_mandate, clear_mandate, get_cached_config, save_cached_config
 
 # Chain configuration from .env
-from chain_config import get_chain_config, ChainConfig
+from chain_config import get_chain_config, ChainConfig, BLOCK_TIME_SECONDS
 
 # Load environment variables
 load_dotenv()
@@ -85,12 +101,72 @@ BUYER_PRIVATE_KEY = os.getenv('BUYER_PRIVATE_KEY')
 # Seller API URL (can be changed to discover from multiple sellers)
 SELLER_API_URL = os.getenv('SELLER_API_URL', 'http://localhost:8000')
 
+# How long to wait for the seller API to start accepting connections
+SELLER_READY_TIMEOUT_SECONDS = 5
+
 # Payment configuration
 MANDATE_BUDGET_USD = float(os.getenv('MANDATE_BUDGET_USD', 100.0))
 
+# ERC-20 transfer(address,uint256) selector - first 4 bytes of its keccak256 hash
+TRANSFER_SELECTOR = bytes.fromhex("a9059cbb")
+
+# Commission config changes rarely - cache it in-process and on disk (across runs)
+# so each purchase skips the round-trip and the address padding
+COMMISSION_CONFIG_TTL_SECONDS = 300
+
+# Seller catalogs rarely change - reuse a recent one if the agent revisits discovery
+CATALOG_CACHE_TTL_SECONDS = 60
+
+# EIP-1559 tip floor, used when fee history has no reward data
+MIN_PRIORITY_FEE_WEI = 10_000_000  # 0.01 gwei
+
 # Chain/token configuration - loaded from .env in main()
 CHAIN_CONFIG = None  # Set in main() from chain_config
 
+ADDRESS_RE = re.compile(r'0x[0-9a-fA-F]{40}')
+
+@functools.lru_cache(maxsize=256)
+def _pad_address(address: str) -> bytes:
+    """Left-pad a 0x-prefixed 20-byte address to a 32-byte ABI word (cached per address)"""
+    # int() alone would also accept truncated/odd-length hex, '_' and whitespace and
+    # silently pad it into a different address - transfers can't be reversed
+    if not ADDRESS_RE.fullmatch(address):
+        raise ValueError(f"Invalid address (expected 0x + 40 hex digits): {address!r}")
+    return int(address, 16).to_bytes(32, byteorder='big')
+
+def _encode_transfer(to_word: bytes, amount_atomic: int) -> bytes:
+    """ABI-encode ERC-20 transfer(to, amount) calldata (68 bytes)"""
+    return b''.join((TRANSFER_SELECTOR, to_word, amount_atomic.to_bytes(32, byteorder='big')))
+
+HTTP_TIMEOUT = (3.05, 30)  # (connect, read) seconds for gateway calls
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Shared HTTP session for every buyer call (seller API, AgentGatePay gateway,
+# RPC) - keep-alive reuses connections across discover -> request -> pay -> claim
+http_session = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    # read=0: never resend a request the server may still be processing (e.g. a
+    # claim blocked in the seller's payment verification) - it would run twice
+    max_retries=Retry(total=2, read=0, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+)
+http_session.mount("http://", _adapter)  # Local seller API
+http_session.mount("https://", _adapter)
+
+@dataclass(slots=True)
+class PaymentState:
+    """Pending purchase - filled by request_resource, execute_payment and claim_resource"""
+    resource_id: str
+    resource_name: str
+    price_usd: float
+    recipient: str
+    commission_address: str
+    commission_rate: float
+    merchant_tx: Optional[str] = None
+    commission_tx: Optional[str] = None
+    resource_data: Optional[dict] = None
+
 # ========================================
 # BUYER AGENT CLASS
 # ========================================
@@ -117,13 +193,15 @@ class BuyerAgent:
         self.config = config
 
         # Initialize Web3 with config RPC
-        self.web3 = Web3(Web3.HTTPProvider(config.rpc_url))
+        self.web3 = Web3(Web3.HTTPProvider(config.rpc_url, session=http_session))
         self.account = Account.from_key(BUYER_PRIVATE_KEY)
 
         # State
         self.current_mandate = None
         self.last_payment = None
         self.discovered_resources = []
+        self._commission_cache = {"data": None, "expires": 0.0}
+        self._catalog_cache = {}  # seller_url -> (expires, resources, result)
 
         print(f"\n🤖 BUYER AGENT INITIALIZED")
         print(f"=" * 60)
@@ -136,17 +214,45 @@ class BuyerAgent:
         print(f"=" * 60)
 
     def get_commission_config(self) -> dict:
-        """Fetch live commission configuration from AgentGatePay API"""
+        """Fetch live commission configuration from AgentGatePay API (cached for COMMISSION_CONFIG_TTL_SECONDS)"""
+        if self._commission_cache["data"] and time.monotonic() < self._commission_cache["expires"]:
+            return self._commission_cache["data"]
+
+        data, ttl_left = get_cached_config('commission', AGENTPAY_API_URL)
+        if not data:
+            try:
+                response = http_session.get(
+                    f"{AGENTPAY_API_URL}/v1/config/commission",
+                    headers={"x-api-key": BUYER_API_KEY},
+                    timeout=HTTP_TIMEOUT
+                )
+                response.raise_for_status()
+                data = json_loads(response.content)
+            except Exception as e:
+                print(f"⚠️  Failed to fetch commission config: {e}")
+                return None
+            save_cached_config('commission', AGENTPAY_API_URL, data, COMMISSION_CONFIG_TTL_SECONDS)
+            ttl_left = COMMISSION_CONFIG_TTL_SECONDS
+
+        # Precompute the ABI word once per fetch instead of once per payment
+        data['commission_address_word'] = _pad_address(data['commission_address'])
+        self._commission_cache["data"] = data
+        self._commission_cache["expires"] = time.monotonic() + ttl_left  # a disk hit keeps its original expiry
+        return data
+
+    def warm_up(self):
+        """Pre-open the pooled RPC and gateway connections and check the RPC serves the configured chain"""
         try:
-            response = requests.get(
-                f"{AGENTPAY_API_URL}/v1/config/commission",
-                headers={"x-api-key": BUYER_API_KEY}
-            )
-            response.raise_for_status()
-            return response.json()
+            payload = {"jsonrpc": "2.0", "id": 1, "method": "eth_chainId", "params": []}
+            result = json_loads(http_session.post(self.config.rpc_url, data=json_dumps(payload), headers=JSON_HEADERS, timeout=10).content)
+            rpc_chain_id = int(result['result'], 16)
+            if rpc_chain_id != self.config.chain_id:
+                print(f"⚠️  RPC chain ID {rpc_chain_id} does not match {self.config.chain} ({self.config.chain_id})")
         except Exception as e:
-            print(f"⚠️  Failed to fetch commission config: {e}")
-            return None
+            print(f"⚠️  RPC warm-up failed: {e}")
+
+        # Also fills the commission cache ahead of the first payment
+        self.get_commission_config()
 
     def decode_mandate_token(self, token: str) -> dict:
         """Decode AP2 mandate token to extract payload"""
@@ -160,16 +266,29 @@ class BuyerAgent:
             if padding != 4:
                 payload_b64 += '=' * padding
             payload_json = base64.urlsafe_b64decode(payload_b64)
-            return json.loads(payload_json)
+            return json_loads(payload_json)
         except:
             return {}
 
+    def session_mandate_usable(self) -> bool:
+        """True if current_mandate is unexpired and has budget left (missing or malformed values count as unusable)"""
+        try:
+            return (float(self.current_mandate['expires_at']) > time.time()
+                    and float(self.current_mandate['budget_remaining']) > 0)
+        except (KeyError, TypeError, ValueError):
+            return False
+
     def issue_mandate(self, budget_usd: float, ttl_minutes: int = 10080, purpose: str = "general purchases") -> str:
         """Issue AP2 payment mandate and fetch live budget"""
-        print(f"\n🔐 [BUYER] Issuing mandate with ${budget_usd} budget for {ttl_minutes} minutes...")
-        print(f"   Purpose: {purpose}")
-
         try:
+            # Mandate already loaded and verified in this session with budget left - no need to look it up or verify again
+            if self.current_mandate and self.session_mandate_usable():
+                print(f"\n♻️  [BUYER] Mandate already active (Budget: ${self.current_mandate['budget_remaining']})")
+                return f"MANDATE_TOKEN:{self.current_mandate['mandate_token']}"
+
+            print(f"\n🔐 [BUYER] Issuing mandate with ${budget_usd} budget for {ttl_minutes} minutes...")
+            print(f"   Purpose: {purpose}")
+
             # Check if mandate already exists
             agent_id = f"buyer-agent-{self.account.address}"
             existing_mandate = get_mandate(agent_id)
@@ -179,14 +298,15 @@ class BuyerAgent:
 
                 # Get LIVE budget from gateway
                 print(f"   🔍 Fetching live budget from API...")
-                verify_response = requests.post(
+                verify_response = http_session.post(
                     f"{AGENTPAY_API_URL}/mandates/verify",
                     headers={"x-api-key": BUYER_API_KEY, "Content-Type": "application/json"},
-                    json={"mandate_token": token}
+                    data=json_dumps({"mandate_token": token}),
+                    timeout=HTTP_TIMEOUT
                 )
 
                 if verify_response.status_code == 200:
-                    verify_data = verify_response.json()
+                    verify_data = json_loads(verify_response.content)
                     budget_remaining = verify_data.get('budget_remaining', 'Unknown')
                 else:
                     token_data = self.decode_mandate_token(token)
@@ -208,14 +328,15 @@ class BuyerAgent:
             # Fetch live budget from API
             token = mandate['mandate_token']
             print(f"   🔍 Fetching live budget from API...")
-            verify_response = requests.post(
+            verify_response = http_session.post(
                 f"{AGENTPAY_API_URL}/mandates/verify",
                 headers={"x-api-key": BUYER_API_KEY, "Content-Type": "application/json"},
-                json={"mandate_token": token}
+                data=json_dumps({"mandate_token": token}),
+                timeout=HTTP_TIMEOUT
             )
 
             if verify_response.status_code == 200:
-                verify_data = verify_response.json()
+                verify_data = json_loads(verify_response.content)
                 budget_remaining = verify_data.get('budget_remaining', budget_usd)
             else:
                 token_data = self.decode_mandate_token(token)
@@ -245,13 +366,19 @@ class BuyerAgent:
 
     def discover_catalog(self, seller_url: str) -> str:
         """Discover resource catalog from seller"""
+        cached = self._catalog_cache.get(seller_url)
+        if cached and time.monotonic() < cached[0]:
+            print(f"\n♻️  [BUYER] Using cached catalog from: {seller_url}")
+            self.discovered_resources = cached[1]
+            return cached[2]
+
         print(f"\n🔍 [BUYER] Discovering catalog from: {seller_url}")
 
         try:
-            response = requests.get(f"{seller_url}/catalog", timeout=10)
+            response = http_session.get(f"{seller_url}/catalog", timeout=10)
 
             if response.status_code == 200:
-                catalog = response.json()
+                catalog = json_loads(response.content)
                 self.discovered_resources = catalog.get('catalog', [])
 
                 print(f"✅ Discovered {len(self.discovered_resources)} resources:")
@@ -263,7 +390,9 @@ class BuyerAgent:
                 for res in self.discovered_resources:
                     resources_list.append(f"ID: '{res['id']}', Name: '{res['name']}', Price: ${res['price_usd']}, Description: '{res['description']}'")
 
-                return f"Found {len(self.discovered_resources)} resources:\n" + "\n".join(resources_list) + f"\n\nIMPORTANT: Use the 'ID' field (e.g., 'market-data-api') when calling request_resource, NOT the name or description."
+                result = f"Found {len(self.discovered_resources)} resources:\n" + "\n".join(resources_list) + f"\n\nIMPORTANT: Use the 'ID' field (e.g., 'market-data-api') when calling request_resource, NOT the name or description."
+                self._catalog_cache[seller_url] = (time.monotonic() + CATALOG_CACHE_TTL_SECONDS, self.discovered_resources, result)
+                return result
 
             else:
                 error_msg = f"Catalog discovery failed: HTTP {response.status_code}"
@@ -275,12 +404,30 @@ class BuyerAgent:
             print(f"❌ {error_msg}")
             return error_msg
 
+    def invalidate_stale_catalogs(self, resource_id: str, live_resource: dict = None):
+        """
+        Drop cached catalogs that disagree with the seller about resource_id.
+
+        live_resource is the resource from the seller's 402 response; None means
+        the seller no longer has it (404), so any catalog listing it is stale.
+        """
+        for seller_url, (_, resources, _) in list(self._catalog_cache.items()):
+            for res in resources:
+                if res['id'] != resource_id:
+                    continue
+                if (live_resource is None
+                        or res['price_usd'] != live_resource['price_usd']
+                        or res['name'] != live_resource['name']):
+                    del self._catalog_cache[seller_url]
+                    print(f"   ♻️  Cached catalog from {seller_url} is stale - will rediscover")
+                break
+
     def request_resource(self, resource_id: str) -> str:
         """Request resource and get payment requirements"""
         print(f"\n📋 [BUYER] Requesting resource: {resource_id}")
 
         try:
-            response = requests.get(
+            response = http_session.get(
                 f"{SELLER_API_URL}/resource",
                 params={"resource_id": resource_id},
                 timeout=10
@@ -288,7 +435,7 @@ class BuyerAgent:
 
             if response.status_code == 402:
                 # Payment required
-                data = response.json()
+                data = json_loads(response.content)
                 payment_info = data.get('payment_info', {})
 
                 print(f"💳 Payment required:")
@@ -296,15 +443,18 @@ class BuyerAgent:
                 print(f"   Price: ${data['resource']['price_usd']}")
                 print(f"   Recipient: {payment_info['recipient_wallet'][:20]}...")
 
+                # Seller's live terms differ from a cached catalog - rediscover next time
+                self.invalidate_stale_catalogs(resource_id, data['resource'])
+
                 # Store payment info for later
-                self.last_payment = {
-                    "resource_id": resource_id,
-                    "resource_name": data['resource']['name'],
-                    "price_usd": data['resource']['price_usd'],
-                    "recipient": payment_info['recipient_wallet'],
-                    "commission_address": payment_info['commission_address'],
-                    "commission_rate": payment_info['commission_rate']
-                }
+                self.last_payment = PaymentState(
+                    resource_id=resource_id,
+                    resource_name=data['resource']['name'],
+                    price_usd=data['resource']['price_usd'],
+                    recipient=payment_info['recipient_wallet'],
+                    commission_address=payment_info['commission_address'],
+                    commission_rate=payment_info['commission_rate']
+                )
 
                 return f"Resource '{data['resource']['name']}' costs ${data['resource']['price_usd']}. Payment required to access."
 
@@ -314,12 +464,13 @@ class BuyerAgent:
                 return f"Resource accessed successfully"
 
             elif response.status_code == 404:
-                error = response.json().get('error', 'Resource not found')
+                error = json_loads(response.content).get('error', 'Resource not found')
+                self.invalidate_stale_catalogs(resource_id)
                 print(f"❌ {error}")
                 return f"Error: {error}"
 
             else:
-                error = response.json().get('error', 'Unknown error')
+                error = json_loads(response.content).get('error', 'Unknown error')
                 print(f"❌ Request failed: {error}")
                 return f"Request failed: {error}"
 
@@ -336,8 +487,8 @@ class BuyerAgent:
         if not self.current_mandate:
             return "Error: No mandate issued. Call issue_mandate first."
 
-        payment_info = self.last_payment
-        print(f"\n💳 [BUYER] Executing payment: ${payment_info['price_usd']} to {payment_info['recipient'][:10]}...")
+        payment = self.last_payment
+        print(f"\n💳 [BUYER] Executing payment: ${payment.price_usd} to {payment.recipient[:10]}...")
 
         try:
             # Fetch live commission config
@@ -348,71 +499,68 @@ class BuyerAgent:
             else:
                 return "Error: Failed to fetch commission configuration"
 
-            # Calculate amounts (using config decimals)
-            total_usd = payment_info['price_usd']
-            commission_rate = payment_info['commission_rate']
-            commission_usd = total_usd * commission_rate
-            merchant_usd = total_usd - commission_usd
+            # Calculate amounts in integer atomic units: one exact Decimal conversion,
+            # merchant gets the remainder so the split always sums to the total
+            total_usd = payment.price_usd
+            commission_rate = Decimal(str(payment.commission_rate))
+            amount_atomic = int(Decimal(str(total_usd)) * self.config.atomic_multiplier)
+            commission_atomic = int(amount_atomic * commission_rate)
+            merchant_atomic = amount_atomic - commission_atomic
 
-            merchant_atomic = int(merchant_usd * (10 ** self.config.decimals))
-            commission_atomic = int(commission_usd * (10 ** self.config.decimals))
+            print(f"   Merchant: ${merchant_atomic / self.config.atomic_multiplier:.4f} ({merchant_atomic} atomic)")
+            print(f"   Commission: ${commission_atomic / self.config.atomic_multiplier:.4f} ({commission_atomic} atomic)")
 
-            print(f"   Merchant: ${merchant_usd:.4f} ({merchant_atomic} atomic)")
-            print(f"   Commission: ${commission_usd:.4f} ({commission_atomic} atomic)")
-
-            # ERC-20 transfer function
-            transfer_sig = self.web3.keccak(text="transfer(address,uint256)")[:4]
-
-            # Get nonce ONCE before both transactions
-            merchant_nonce = self.web3.eth.get_transaction_count(self.account.address)
+            # Get nonce and fees ONCE for both transactions ('pending' counts our own in-flight TXs)
+            merchant_nonce, max_fee, priority_fee = self.get_nonce_and_fees()
             print(f"   📊 Current nonce: {merchant_nonce}")
 
             # TX 1: Merchant payment
             print(f"   📤 Signing merchant transaction...")
-            merchant_data = transfer_sig + \
-                           self.web3.to_bytes(hexstr=payment_info['recipient']).rjust(32, b'\x00') + \
-                           merchant_atomic.to_bytes(32, byteorder='big')
+            merchant_data = _encode_transfer(_pad_address(payment.recipient), merchant_atomic)
 
             merchant_tx = {
                 'nonce': merchant_nonce,
                 'to': self.config.token_contract,
                 'value': 0,
                 'gas': 100000,
-                'gasPrice': self.web3.eth.gas_price,
+                'type': 2,
+                'maxFeePerGas': max_fee,
+                'maxPriorityFeePerGas': priority_fee,
                 'data': merchant_data,
                 'chainId': self.config.chain_id
             }
 
-            signed_merchant = self.account.sign_transaction(merchant_tx)
-            tx_hash_merchant = self.web3.eth.send_raw_transaction(signed_merchant.raw_transaction)
-            print(f"   ✅ Merchant TX sent: {tx_hash_merchant.hex()}")
-
-            # TX 2: Commission payment (sign and send immediately - parallel execution)
+            # TX 2: Commission payment (nonce + 1, independent of the merchant transfer)
             print(f"   📤 Signing commission transaction...")
-            commission_data = transfer_sig + \
-                             self.web3.to_bytes(hexstr=commission_address).rjust(32, b'\x00') + \
-                             commission_atomic.to_bytes(32, byteorder='big')
+            commission_data = _encode_transfer(commission_config['commission_address_word'], commission_atomic)
 
             commission_tx = {
                 'nonce': merchant_nonce + 1,
                 'to': self.config.token_contract,
                 'value': 0,
                 'gas': 100000,
-                'gasPrice': self.web3.eth.gas_price,
+                'type': 2,
+                'maxFeePerGas': max_fee,
+                'maxPriorityFeePerGas': priority_fee,
                 'data': commission_data,
                 'chainId': self.config.chain_id
             }
 
+            # Sign both before broadcasting so they go out back-to-back and confirm together
+            signed_merchant = self.account.sign_transaction(merchant_tx)
             signed_commission = self.account.sign_transaction(commission_tx)
-            tx_hash_commission = self.web3.eth.send_raw_transaction(signed_commission.raw_transaction)
-            print(f"   ✅ Commission TX sent: {tx_hash_commission.hex()}")
+
+            merchant_tx_hex, commission_tx_hex = self.send_raw_transactions([
+                signed_merchant.raw_transaction,
+                signed_commission.raw_transaction
+            ])
+            print(f"   ✅ Merchant TX sent: {merchant_tx_hex}")
+            print(f"   ✅ Commission TX sent: {commission_tx_hex}")
 
             # Store transaction hashes
-            merchant_tx_hex = self.web3.to_hex(tx_hash_merchant)
-            commission_tx_hex = self.web3.to_hex(tx_hash_commission)
 
-            self.last_payment['merchant_tx'] = merchant_tx_hex
-            self.last_payment['commission_tx'] = commission_tx_hex
+            payment.merchant_tx = merchant_tx_hex
+            payment.commission_tx = commission_tx_hex
 
             print(f"\n💳 Processing payment...")
 
@@ -428,7 +576,7 @@ class BuyerAgent:
                         "tx_hash": merchant_tx_hex,
                         "tx_hash_commission": commission_tx_hex
                     }
-                    payment_b64 = base64.b64encode(json.dumps(payment_payload).encode()).decode()
+                    payment_b64 = base64.b64encode(json_dumps(payment_payload)).decode()
 
                     headers = {
                         "x-api-key": BUYER_API_KEY,
@@ -437,7 +585,7 @@ class BuyerAgent:
                     }
 
                     url = f"{AGENTPAY_API_URL}/x402/resource?chain={self.config.chain}&token={self.config.token}&price_usd={total_usd}"
-                    gateway_result["response"] = requests.get(url, headers=headers, timeout=120)
+                    gateway_result["response"] = http_session.get(url, headers=headers, timeout=120)
                     print(f"   ✅ Gateway response received")
                 except Exception as e:
                     gateway_result["error"] = str(e)
@@ -450,11 +598,9 @@ class BuyerAgent:
             # Verify transactions on-chain (120s timeout for Ethereum public RPCs)
             print(f"   🔍 Verifying transactions on-chain...")
             try:
-                receipt_merchant = self.web3.eth.wait_for_transaction_receipt(tx_hash_merchant, timeout=120)
-                print(f"   ✅ Merchant TX confirmed (block {receipt_merchant['blockNumber']})")
-
-                receipt_commission = self.web3.eth.wait_for_transaction_receipt(tx_hash_commission, timeout=120)
-                print(f"   ✅ Commission TX confirmed (block {receipt_commission['blockNumber']})")
+                block_merchant, block_commission = self.wait_for_receipts([merchant_tx_hex, commission_tx_hex], timeout=120)
+                print(f"   ✅ Merchant TX confirmed (block {block_merchant})")
+                print(f"   ✅ Commission TX confirmed (block {block_commission})")
             except Exception as e:
                 print(f"   ⚠️  Verification failed: {e}")
 
@@ -469,12 +615,12 @@ class BuyerAgent:
                 return "Gateway timeout - please check payment status manually"
 
             if response.status_code >= 400:
-                result = response.json() if response.text else {}
+                result = json_loads(response.content) if response.content else {}
                 error = result.get('error', response.text)
                 print(f"❌ Gateway error ({response.status_code}): {error}")
                 return f"Failed: {error}"
 
-            result = response.json()
+            result = json_loads(response.content)
             print(f"   🔍 Gateway response: {result}")
 
             if result.get('message') or result.get('success') or result.get('paid') or result.get('status') in ['confirmed', 'pending']:
@@ -486,14 +632,15 @@ class BuyerAgent:
 
                 # Fetch updated budget
                 print(f"   🔍 Fetching updated budget...")
-                verify_response = requests.post(
+                verify_response = http_session.post(
                     f"{AGENTPAY_API_URL}/mandates/verify",
                     headers={"x-api-key": BUYER_API_KEY, "Content-Type": "application/json"},
-                    json={"mandate_token": self.current_mandate['mandate_token']}
+                    data=json_dumps({"mandate_token": self.current_mandate['mandate_token']}),
+                    timeout=HTTP_TIMEOUT
                 )
 
                 if verify_response.status_code == 200:
-                    verify_data = verify_response.json()
+                    verify_data = json_loads(verify_response.content)
                     new_budget = verify_data.get('budget_remaining', 'Unknown')
                     print(f"   ✅ Budget updated: ${new_budget}")
 
@@ -518,13 +665,119 @@ class BuyerAgent:
             print(f"❌ {error_msg}")
             return error_msg
 
+    def post_rpc_batch(self, batch: list):
+        """POST a JSON-RPC batch; returns the result list, or None if the provider rejected the batch"""
+        response = http_session.post(self.config.rpc_url, data=json_dumps(batch), headers=JSON_HEADERS, timeout=10)
+        try:
+            # Providers without batch support may answer with an HTML/text error page
+            results = json_loads(response.content) if response.ok else None
+        except ValueError:
+            results = None
+        return results if isinstance(results, list) else None
+
+    def get_nonce_and_fees(self) -> tuple:
+        """
+        Fetch the pending nonce and EIP-1559 fees in one JSON-RPC batch round-trip.
+
+        Returns (nonce, max_fee_per_gas, max_priority_fee_per_gas). A single
+        eth_feeHistory call gives both the next block's base fee and the median tip.
+        """
+        batch = [
+            {"jsonrpc": "2.0", "id": 0, "method": "eth_getTransactionCount", "params": [self.account.address, "pending"]},
+            {"jsonrpc": "2.0", "id": 1, "method": "eth_feeHistory", "params": ["0x1", "latest", [50]]}
+        ]
+        results = self.post_rpc_batch(batch)
+
+        if results is not None and all('result' in item for item in results):
+            by_id = {item['id']: item['result'] for item in results}
+            nonce = int(by_id[0], 16)
+            base_fees = [int(fee, 16) for fee in by_id[1]['baseFeePerGas']]
+            rewards = [[int(tip, 16) for tip in block] for block in by_id[1].get('reward') or []]
+        else:
+            # Provider does not support batching - fall back to two separate calls
+            nonce = self.web3.eth.get_transaction_count(self.account.address, 'pending')
+            fee_history = self.web3.eth.fee_history(1, 'latest', [50])
+            base_fees = fee_history['baseFeePerGas']
+            rewards = fee_history.get('reward') or []
+
+        # baseFeePerGas has one extra entry - the base fee of the next block
+        base_fee = base_fees[-1]
+        priority_fee = max(rewards[-1][0], MIN_PRIORITY_FEE_WEI) if rewards else MIN_PRIORITY_FEE_WEI
+
+        # 2x base fee covers several consecutive full blocks before the TX would be priced out
+        return nonce, 2 * base_fee + priority_fee, priority_fee
+
+    def send_raw_transactions(self, raw_transactions: list) -> list:
+        """Broadcast signed transactions in one JSON-RPC batch; returns 0x-prefixed tx hashes in input order"""
+        batch = [
+            {"jsonrpc": "2.0", "id": i, "method": "eth_sendRawTransaction", "params": [self.web3.to_hex(raw)]}
+            for i, raw in enumerate(raw_transactions)
+        ]
+        results = self.post_rpc_batch(batch)
+
+        if results is None:
+            # Provider rejected the batch - nothing was broadcast, send one at a time
+            return [self.web3.to_hex(self.web3.eth.send_raw_transaction(raw)) for raw in raw_transactions]
+
+        by_id = {item.get('id'): item for item in results}
+        tx_hashes = []
+        for i in range(len(raw_transactions)):
+            item = by_id.get(i, {})
+            if 'result' not in item:
+                raise Exception(f"eth_sendRawTransaction failed: {item.get('error', 'missing response')}")
+            tx_hashes.append(item['result'])
+        return tx_hashes
+
+    def wait_for_receipts(self, tx_hashes: list, timeout: int = 120) -> list:
+        """
+        Wait for several transactions at once, polling all pending receipts
+        in a single JSON-RPC batch per tick. Returns the block numbers in input order.
+
+        Polling starts at 250ms and doubles up to the chain's block time, so fast
+        confirmations are seen quickly without hammering the RPC on slow chains.
+        """
+        deadline = time.monotonic() + timeout
+        blocks = [None] * len(tx_hashes)
+        max_poll_interval = BLOCK_TIME_SECONDS.get(self.config.chain, 1.0)
+        poll_interval = min(0.25, max_poll_interval)
+
+        while True:
+            batch = [
+                {"jsonrpc": "2.0", "id": i, "method": "eth_getTransactionReceipt", "params": [tx_hash]}
+                for i, tx_hash in enumerate(tx_hashes) if blocks[i] is None
+            ]
+            results = self.post_rpc_batch(batch)
+
+            if results is None:
+                # Provider does not support batching - fall back to one wait per transaction
+                return [
+                    self.web3.eth.wait_for_transaction_receipt(
+                        tx_hash, timeout=timeout, poll_latency=max_poll_interval
+                    )['blockNumber']
+                    for tx_hash in tx_hashes
+                ]
+
+            for item in results:
+                receipt = item.get('result')
+                if receipt:
+                    blocks[item['id']] = int(receipt['blockNumber'], 16)
+
+            if all(block is not None for block in blocks):
+                return blocks
+
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Transactions not confirmed within {timeout}s")
+
+            time.sleep(poll_interval)
+            poll_interval = min(poll_interval * 2, max_poll_interval)
+
     def claim_resource(self) -> str:
         """Claim resource by submitting payment proof (with retry logic for DynamoDB propagation delays)"""
-        if not self.last_payment or 'merchant_tx' not in self.last_payment:
+        if not self.last_payment or not self.last_payment.merchant_tx:
             return "Error: No payment executed. Call sign_and_pay first."
 
-        payment_info = self.last_payment
-        print(f"\n📦 [BUYER] Claiming resource: {payment_info['resource_name']}")
+        payment = self.last_payment
+        print(f"\n📦 [BUYER] Claiming resource: {payment.resource_name}")
 
         # Retry claim up to 12 times with 10-second delays (handles gateway processing time)
         max_retries = 12
@@ -533,29 +786,29 @@ class BuyerAgent:
         for attempt in range(max_retries):
             try:
                 # Submit payment proof to seller
-                payment_header = f"{payment_info['merchant_tx']},{payment_info['commission_tx']}"
+                payment_header = f"{payment.merchant_tx},{payment.commission_tx}"
 
-                response = requests.get(
+                response = http_session.get(
                     f"{SELLER_API_URL}/resource",
-                    params={"resource_id": payment_info['resource_id']},
+                    params={"resource_id": payment.resource_id},
                     headers={"x-payment": payment_header},
                     timeout=30  # Allow time for verification
                 )
 
                 if response.status_code == 200:
                     # SUCCESS - resource delivered
-                    data = response.json()
+                    data = json_loads(response.content)
                     print(f"✅ Resource delivered!")
-                    print(f"   Resource: {payment_info['resource_name']}")
+                    print(f"   Resource: {payment.resource_name}")
                     print(f"   Payment verified: {data['payment_confirmation']['amount_verified_usd']} USD")
 
                     # Store resource
-                    self.last_payment['resource_data'] = data['resource']
+                    payment.resource_data = data['resource']
 
-                    return f"Resource '{payment_info['resource_name']}' received successfully! Payment verified: ${data['payment_confirmation']['amount_verified_usd']}"
+                    return f"Resource '{payment.resource_name}' received successfully! Payment verified: ${data['payment_confirmation']['amount_verified_usd']}"
 
                 else:
-                    error = response.json().get('error', 'Unknown error')
+                    error = json_loads(response.content).get('error', 'Unknown error')
 
                     # If this is not the last attempt, retry after delay
                     if attempt < max_retries - 1:
@@ -625,6 +878,10 @@ if __name__ == "__main__":
     # Initialize buyer agent (buyer is module-level, no global needed)
     buyer = BuyerAgent(config)
 
+    # Open the RPC and gateway connections while the mandate is configured,
+    # so the first payment does not pay for the handshakes
+    threading.Thread(target=buyer.warm_up, daemon=True).start()
+
     # ========================================
     # STEP 1: CONFIGURE MANDATE FIRST
     # ========================================
@@ -637,14 +894,15 @@ if __name__ == "__main__":
         token = existing_mandate.get('mandate_token')
 
         # Get LIVE budget from gateway
-        verify_response = requests.post(
+        verify_response = http_session.post(
             f"{AGENTPAY_API_URL}/mandates/verify",
             headers={"x-api-key": BUYER_API_KEY, "Content-Type": "application/json"},
-            json={"mandate_token": token}
+            data=json_dumps({"mandate_token": token}),
+            timeout=HTTP_TIMEOUT
         )
 
         if verify_response.status_code == 200:
-            verify_data = verify_response.json()
+            verify_data = json_loads(verify_response.content)
             budget_remaining = verify_data.get('budget_remaining', 'Unknown')
         else:
             # Fallback to JWT if verify fails
@@ -654,6 +912,10 @@ if __name__ == "__main__":
         # Extract mandate purpose
         mandate_purpose = existing_mandate.get('purpose', 'general purchases')
 
+        # Hand the verified mandate to the agent so its issue_mandate tool reuses it directly
+        buyer.current_mandate = existing_mandate
+        buyer.current_mandate['budget_remaining'] = budget_remaining
+
         print(f"\n♻️  Using existing mandate")
         print(f"   Purpose: {mandate_purpose}")
         print(f"   Budget remaining: ${budget_remaining}")
@@ -674,7 +936,6 @@ if __name__ == "__main__":
             ttl_input = "7d"
 
         # Parse duration
-        import re
         match = re.match(r'^(\d+)([mhd])$', ttl_input)
 
         if match:
@@ -721,22 +982,27 @@ if __name__ == "__main__":
         # Set global mandate_purpose for tool use
         mandate_purpose = user_need
 
-    # Define tools after buyer is initialized
+    def issue_mandate_tool(budget_usd: float) -> str:
+        return buyer.issue_mandate(budget_usd, mandate_ttl_minutes, mandate_purpose)
+
+    # Define tools after buyer is initialized. StructuredTool derives a typed JSON
+    # schema from each signature, so the LLM sends native arguments and LangChain
+    # validates them - no string parsing inside the tools.
     tools = [
-        Tool(
+        StructuredTool.from_function(
+            func=issue_mandate_tool,
             name="issue_mandate",
-            func=lambda budget: buyer.issue_mandate(float(budget), mandate_ttl_minutes, mandate_purpose),
-            description="Issue AP2 payment mandate with specified budget (USD). Use FIRST before any purchases. Input: budget amount as number. Returns: MANDATE_TOKEN:{token}"
+            description="Issue AP2 payment mandate with specified budget (USD). Use FIRST before any purchases. Returns: MANDATE_TOKEN:{token}"
         ),
-        Tool(
-            name="discover_catalog",
+        StructuredTool.from_function(
             func=buyer.discover_catalog,
-            description="Discover resource catalog from seller API. Input: seller_url (e.g., 'http://localhost:8000')"
+            name="discover_catalog",
+            description="Discover resource catalog from seller API (seller_url e.g. 'http://localhost:8000')"
         ),
-        Tool(
-            name="request_resource",
+        StructuredTool.from_function(
             func=buyer.request_resource,
-            description="Request specific resource and get payment requirements. Input: resource_id string."
+            name="request_resource",
+            description="Request specific resource and get payment requirements by its catalog resource_id."
         ),
         StructuredTool.from_function(
             func=buyer.execute_payment,
@@ -784,17 +1050,27 @@ Think step by step and complete the workflow for ONE resource."""
     # STEP 2: CHECK SELLER AVAILABILITY
     # ========================================
 
+    # Poll briefly instead of failing on the first refused connection, so a
+    # seller started moments ago (e.g. in another terminal) is picked up as
+    # soon as it is listening
     print(f"\n📡 Checking seller API: {SELLER_API_URL}")
-    try:
-        health = requests.get(f"{SELLER_API_URL}/health", timeout=5)
-        if health.status_code == 200:
-            print(f"✅ Seller API is running")
-        else:
-            print(f"⚠️  Seller API returned: HTTP {health.status_code}")
-    except:
-        print(f"❌ Seller API is NOT running!")
-        print(f"   Please start the seller first: python 2b_api_seller_agent.py")
-        exit(1)
+    health = None
+    started = time.monotonic()
+    deadline = started + SELLER_READY_TIMEOUT_SECONDS
+    while health is None:
+        try:
+            health = http_session.get(f"{SELLER_API_URL}/health", timeout=1)
+        except requests.exceptions.RequestException:
+            if time.monotonic() >= deadline:
+                print(f"❌ Seller API is NOT running!")
+                print(f"   Please start the seller first: python 2b_api_seller_agent.py")
+                exit(1)
+            time.sleep(0.05)
+
+    if health.status_code == 200:
+        print(f"✅ Seller API is running (ready in {(time.monotonic() - started) * 1000:.0f}ms)")
+    else:
+        print(f"⚠️  Seller API returned: HTTP {health.status_code}")
 
     # ========================================
     # STEP 3: RUN AUTONOMOUS AGENT
@@ -845,9 +1121,9 @@ Think step by step and complete the workflow for ONE resource."""
             print(f"\n📊 Final Status:")
             print(f"   Budget remaining: ${buyer.current_mandate.get('budget_remaining', 'N/A')}")
 
-        if buyer.last_payment and 'merchant_tx' in buyer.last_payment:
-            print(f"   Merchant TX: {config.explorer}/tx/{buyer.last_payment['merchant_tx']}")
-            print(f"   Commission TX: {config.explorer}/tx/{buyer.last_payment['commission_tx']}")
+        if buyer.last_payment and buyer.last_payment.merchant_tx:
+            print(f"   Merchant TX: {config.explorer}/tx/{buyer.last_payment.merchant_tx}")
+            print(f"   Commission TX: {config.explorer}/tx/{buyer.last_payment.commission_tx}")
 
             # Display gateway audit logs with curl commands
             print(f"\nGateway Audit Logs (copy-paste these commands):")
@@ -858,12 +1134,12 @@ Think step by step and complete the workflow for ONE resource."""
             print(f"curl '{AGENTPAY_API_URL}/audit/logs?client_id={buyer.account.address}&event_type=x402_payment_settled&hours=24' \\")
             print(f"  -H 'x-api-key: {BUYER_API_KEY}' | python3 -m json.tool")
             print(f"\n# Payment verification (by tx_hash):")
-            print(f"curl '{AGENTPAY_API_URL}/v1/payments/verify/{buyer.last_payment['merchant_tx']}' \\")
+            print(f"curl '{AGENTPAY_API_URL}/v1/payments/verify/{buyer.last_payment.merchant_tx}' \\")
             print(f"  -H 'x-api-key: {BUYER_API_KEY}' | python3 -m json.tool")
 
-        if buyer.last_payment and 'resource_data' in buyer.last_payment:
+        if buyer.last_payment and buyer.last_payment.resource_data:
             print(f"\n📦 Received Resource:")
-            resource = buyer.last_payment['resource_data']
+            resource = buyer.last_payment.resource_data
 
             # Display resource data based on type (different resources have different fields)
             if 'title' in resource:
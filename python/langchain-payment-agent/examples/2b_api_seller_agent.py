@@ -24,15 +24,25 @@ Requirements:
 """
 
 import os
+import re
 import sys
 import time
 import hmac
 import hashlib
+import json
 from typing import Dict, Any, Optional
 from dotenv import load_dotenv
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request
 from agentgatepay_sdk import AgentGatePay
 
+# orjson is optional - faster JSON for seller responses, stdlib fallback
+try:
+    import orjson
+    json_dumps = orjson.dumps
+except ImportError:
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(',', ':')).encode()
+
 # Add parent directory to path for chain_config import
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
@@ -53,6 +63,11 @@ COMMISSION_RATE = 0.005  # 0.5%
 
 SELLER_API_PORT = int(os.getenv('SELLER_API_PORT', 8000))
 
+# Confirmed payments are final - reuse them for buyer retries/re-checks of the same tx.
+# Optimistic 'pending' results are never cached: background verification may still fail.
+PAYMENT_VERIFY_CACHE_TTL_SECONDS = 300
+PAYMENT_VERIFY_CACHE_MAX_ENTRIES = 10_000
+
 # Chain/token configuration - will be selected interactively on first run
 CHAIN_CONFIG = None  # Set in main() from monitoring config
 
@@ -74,6 +89,16 @@ def get_commission_address():
 
 COMMISSION_ADDRESS = get_commission_address()
 
+# 32-byte transaction hash as 0x-prefixed hex
+TX_HASH_RE = re.compile(r'0x[0-9a-fA-F]{64}')
+
+# Static part of every 402 response
+PAYMENT_INSTRUCTIONS = [
+    "1. Sign two blockchain transactions (merchant + commission)",
+    "2. Submit payment proof via x-payment header",
+    "3. Format: 'merchant_tx_hash,commission_tx_hash'"
+]
+
 # ========================================
 # SELLER AGENT CLASS
 # ========================================
@@ -101,6 +126,25 @@ class SellerAgent:
 
         # Webhook tracking
         self.pending_deliveries = {}  # {tx_hash: resource_id}
+
+        # Successful payments.verify() results: {tx_hash: (verification, monotonic expiry)}
+        self._verify_cache = {}
+
+        # 402 payment_info fields that do not depend on the resource - built once,
+        # each response only adds the price fields
+        self._payment_info_base = {
+            "recipient_wallet": SELLER_WALLET,
+            "chain": config.chain,
+            "token": config.token,
+            "token_contract": config.token_contract,
+            "decimals": config.decimals,
+            "commission_address": COMMISSION_ADDRESS,
+            "commission_rate": COMMISSION_RATE
+        }
+
+        # Complete 402 bodies per resource_id, built on first request. Prices are
+        # set after init (and may be edited), so each entry remembers the price it was built for.
+        self._payment_required_bodies = {}  # {resource_id: (fingerprint, body)}
         self.webhook_secret = None
 
         # Resource catalog - ADD YOUR RESOURCES HERE
@@ -292,6 +336,52 @@ class SellerAgent:
             }
         }
 
+    def verify_payment(self, tx_hash: str) -> dict:
+        """payments.verify() with a TTL cache for transactions already confirmed"""
+        cached = self._verify_cache.get(tx_hash)
+        if cached and time.monotonic() < cached[1]:
+            return cached[0]
+
+        verification = self.agentpay.payments.verify(tx_hash)
+
+        if verification.get('verified') and verification.get('status') != 'pending':
+            if len(self._verify_cache) >= PAYMENT_VERIFY_CACHE_MAX_ENTRIES:
+                # Evict the oldest entry (dicts keep insertion order)
+                self._verify_cache.pop(next(iter(self._verify_cache)), None)
+            self._verify_cache[tx_hash] = (verification, time.monotonic() + PAYMENT_VERIFY_CACHE_TTL_SECONDS)
+
+        return verification
+
+    def payment_required_body(self, resource: dict) -> dict:
+        """402 response body for a resource (cached per resource and its catalog fields; treat as read-only)"""
+        price_usd = resource['price_usd']
+        # Every catalog field that goes into the body - editing any of them rebuilds it
+        fingerprint = (resource['name'], resource['description'], price_usd, resource['category'])
+        cached = self._payment_required_bodies.get(resource['id'])
+        if cached and cached[0] == fingerprint:
+            return cached[1]
+
+        body = {
+            "error": "Payment Required",
+            "message": "This resource requires payment before access",
+            "resource": {
+                "id": resource['id'],
+                "name": resource['name'],
+                "description": resource['description'],
+                "price_usd": price_usd,
+                "category": resource['category']
+            },
+            "payment_info": {
+                **self._payment_info_base,
+                "total_amount_usd": price_usd,
+                "merchant_amount_usd": price_usd * (1 - COMMISSION_RATE),
+                "commission_amount_usd": price_usd * COMMISSION_RATE
+            },
+            "instructions": PAYMENT_INSTRUCTIONS
+        }
+        self._payment_required_bodies[resource['id']] = (fingerprint, body)
+        return body
+
     def handle_resource_request(self, resource_id: str, payment_header: Optional[str] = None) -> Dict[str, Any]:
         """
         Handle resource request with HTTP 402 protocol.
@@ -324,42 +414,20 @@ class SellerAgent:
 
             return {
                 "status": 402,
-                "body": {
-                    "error": "Payment Required",
-                    "message": "This resource requires payment before access",
-                    "resource": {
-                        "id": resource['id'],
-                        "name": resource['name'],
-                        "description": resource['description'],
-                        "price_usd": resource['price_usd'],
-                        "category": resource['category']
-                    },
-                    "payment_info": {
-                        "recipient_wallet": SELLER_WALLET,
-                        "chain": self.config.chain,
-                        "token": self.config.token,
-                        "token_contract": self.config.token_contract,
-                        "decimals": self.config.decimals,
-                        "commission_address": COMMISSION_ADDRESS,
-                        "commission_rate": COMMISSION_RATE,
-                        "total_amount_usd": resource['price_usd'],
-                        "merchant_amount_usd": resource['price_usd'] * (1 - COMMISSION_RATE),
-                        "commission_amount_usd": resource['price_usd'] * COMMISSION_RATE
-                    },
-                    "instructions": [
-                        "1. Sign two blockchain transactions (merchant + commission)",
-                        "2. Submit payment proof via x-payment header",
-                        "3. Format: 'merchant_tx_hash,commission_tx_hash'"
-                    ]
-                }
+                "body": self.payment_required_body(resource)
             }
 
         # Payment provided → Verify
         print(f"\n🔍 [SELLER] Verifying payment for: {resource['name']}")
 
-        # Parse payment header
-        parts = payment_header.split(',')
-        if len(parts) != 2:
+        # Parse payment header - exactly one comma, both halves well-formed tx hashes,
+        # so malformed proofs are rejected before any gateway call
+        sep = payment_header.find(',')
+        tx_hash_merchant = payment_header[:sep].strip()
+        tx_hash_commission = payment_header[sep + 1:].strip()
+        if (sep < 0 or payment_header.find(',', sep + 1) >= 0
+                or not TX_HASH_RE.fullmatch(tx_hash_merchant)
+                or not TX_HASH_RE.fullmatch(tx_hash_commission)):
             print(f"   ❌ Invalid payment header format")
             return {
                 "status": 400,
@@ -370,9 +438,6 @@ class SellerAgent:
                 }
             }
 
-        tx_hash_merchant = parts[0].strip()
-        tx_hash_commission = parts[1].strip()
-
         print(f"   Merchant TX: {tx_hash_merchant[:20]}...")
         print(f"   Commission TX: {tx_hash_commission[:20]}...")
 
@@ -396,7 +461,7 @@ class SellerAgent:
 
         for attempt in range(max_retries):
             try:
-                verification = self.agentpay.payments.verify(tx_hash_merchant)
+                verification = self.verify_payment(tx_hash_merchant)
 
                 if verification.get('verified'):
                     status = verification.get('status', 'unknown')
@@ -508,6 +573,11 @@ app = Flask(__name__)
 seller = None  # Will be initialized in main() after config selection
 
 
+def json_response(body: dict, status: int = 200) -> Response:
+    """Serialize body straight to a JSON Response (bypasses jsonify's provider machinery)"""
+    return Response(json_dumps(body), status=status, mimetype='application/json')
+
+
 @app.route('/resource', methods=['GET'])
 def resource_endpoint():
     """Main resource endpoint - handles discovery and purchase"""
@@ -515,30 +585,30 @@ def resource_endpoint():
     payment_header = request.headers.get('x-payment')
 
     if not resource_id:
-        return jsonify({
+        return json_response({
             "error": "Missing resource_id parameter",
             "usage": "GET /resource?resource_id=<id>",
             "catalog_endpoint": "/catalog"
-        }), 400
+        }, 400)
 
     response = seller.handle_resource_request(resource_id, payment_header)
-    return jsonify(response['body']), response['status']
+    return json_response(response['body'], response['status'])
 
 
 @app.route('/catalog', methods=['GET'])
 def catalog_endpoint():
     """List all available resources"""
-    return jsonify(seller.list_catalog()), 200
+    return json_response(seller.list_catalog())
 
 
 @app.route('/health', methods=['GET'])
 def health_endpoint():
     """Health check endpoint"""
-    return jsonify({
+    return json_response({
         "status": "healthy",
         "seller_wallet": SELLER_WALLET,
         "resources_available": len(seller.catalog)
-    }), 200
+    })
 
 
 @app.route('/webhooks/payment', methods=['POST'])
@@ -549,11 +619,11 @@ def webhook_endpoint():
         signature = request.headers.get('x-webhook-signature', '')
 
         result = seller.handle_webhook(payload, signature)
-        return jsonify(result), 200
+        return json_response(result)
 
     except Exception as e:
         print(f"❌ Webhook error: {str(e)}")
-        return jsonify({"error": str(e)}), 500
+        return json_response({"error": str(e)}, 500)
 
 
 # ========================================
@@ -692,9 +762,17 @@ if __name__ == "__main__":
     print("💡 Next step: Run the buyer agent (2a_api_buyer_agent.py)")
     print()
 
-    # Start Flask API
-    app.run(
-        host='0.0.0.0',
-        port=SELLER_API_PORT,
-        debug=False  # Set to True for development
-    )
+    # Start the API - waitress (production WSGI server, thread pool) if installed,
+    # otherwise Flask's development server
+    try:
+        from waitress import serve
+    except ImportError:
+        app.run(
+            host='0.0.0.0',
+            port=SELLER_API_PORT,
+            debug=False  # Set to True for development
+        )
+    else:
+        print(f"🚀 Serving with waitress on port {SELLER_API_PORT}")
+        # Payment verification can block a thread for up to ~2 minutes of retries
+        serve(app, host='0.0.0.0', port=SELLER_API_PORT, threads=4, channel_timeout=150)
@@ -30,11 +30,13 @@ For REST API Version: See Example 1a (REST API + local signing)
 """
 
 import os
+import re
 import sys
 import time
 import json
 import base64
 import requests
+from requests.adapters import HTTPAdapter
 from typing import Dict, Any
 from dotenv import load_dotenv
 from web3 import Web3
@@ -48,8 +50,8 @@ from langchain_openai import ChatOpenAI
 # Add parent directory to path for utils import
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-# Utils for mandate storage
-from utils import save_mandate, get_mandate, clear_mandate
+# Utils for mandate storage and config caching
+from utils import save_mandate, get_mandate, clear_mandate, get_cached_config, save_cached_config, clear_cached_config
 
 # Load environment variables
 load_dotenv()
@@ -59,6 +61,16 @@ import sys
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from chain_config import get_chain_config
 
+# orjson is optional - ~3-10x faster JSON for MCP payloads, stdlib fallback
+try:
+    import orjson
+    json_dumps = orjson.dumps
+    json_loads = orjson.loads
+except ImportError:
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(',', ':')).encode()
+    json_loads = json.loads
+
 # ========================================
 # TRANSACTION SIGNING
 # ========================================
@@ -92,6 +104,22 @@ SELLER_WALLET = os.getenv('SELLER_WALLET')
 RESOURCE_PRICE_USD = 0.01
 MANDATE_BUDGET_USD = 100.0
 
+# ERC-20 transfer(address,uint256) selector - first 4 bytes of its keccak256 hash
+TRANSFER_SELECTOR = bytes.fromhex("a9059cbb")
+
+ADDRESS_RE = re.compile(r'0x[0-9a-fA-F]{40}')
+
+def _pad_address(address: str) -> bytes:
+    """Left-pad a 0x-prefixed 20-byte address to a 32-byte ABI word"""
+    # int() alone would also accept truncated/odd-length hex, '_' and whitespace and
+    # silently pad it into a different address - transfers can't be reversed
+    if not ADDRESS_RE.fullmatch(address):
+        raise ValueError(f"Invalid address (expected 0x + 40 hex digits): {address!r}")
+    return int(address, 16).to_bytes(32, byteorder='big')
+
+# 0.01 gwei floor for the EIP-1559 priority fee (tip)
+MIN_PRIORITY_FEE_WEI = 10_000_000
+
 # Multi-chain/token configuration (set after interactive selection)
 # To manually configure without interactive prompt, uncomment and set:
 # config = ChainConfig(
@@ -110,18 +138,41 @@ config = None  # Will be set via get_chain_config() in main()
 # HELPER FUNCTIONS
 # ========================================
 
+# Commission config changes rarely - cache it in-process and on disk (across runs)
+# so repeated payments and fresh runs skip the round-trip
+COMMISSION_CONFIG_TTL_SECONDS = 300
+_commission_cache = {"data": None, "expires": 0.0}
+
 def get_commission_config() -> dict:
-    """Fetch commission configuration from AgentGatePay API"""
-    try:
-        response = requests.get(
-            f"{AGENTPAY_API_URL}/v1/config/commission",
-            headers={"x-api-key": BUYER_API_KEY}
-        )
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        print(f"⚠️  Failed to fetch commission config: {e}")
-        return None
+    """Fetch commission configuration from AgentGatePay API (cached for 5 minutes)"""
+    if _commission_cache["data"] and time.monotonic() < _commission_cache["expires"]:
+        return _commission_cache["data"]
+
+    data, ttl_left = get_cached_config('commission', AGENTPAY_API_URL)
+    if not data:
+        try:
+            response = http_session.get(
+                f"{AGENTPAY_API_URL}/v1/config/commission",
+                headers={"x-api-key": BUYER_API_KEY},
+                timeout=HTTP_TIMEOUT
+            )
+            response.raise_for_status()
+            data = json_loads(response.content)
+        except Exception as e:
+            print(f"⚠️  Failed to fetch commission config: {e}")
+            return None
+        save_cached_config('commission', AGENTPAY_API_URL, data, COMMISSION_CONFIG_TTL_SECONDS)
+        ttl_left = COMMISSION_CONFIG_TTL_SECONDS
+
+    _commission_cache["data"] = data
+    _commission_cache["expires"] = time.monotonic() + ttl_left  # a disk hit keeps its original expiry
+    return data
+
+def invalidate_commission_config():
+    """Drop the cached commission config (in-process and on disk) so the next payment refetches it"""
+    _commission_cache["data"] = None
+    _commission_cache["expires"] = 0.0
+    clear_cached_config('commission', AGENTPAY_API_URL)
 
 def decode_mandate_token(token: str) -> dict:
     """Decode AP2 mandate token to extract payload"""
@@ -134,7 +185,7 @@ def decode_mandate_token(token: str) -> dict:
         if padding != 4:
             payload_b64 += '=' * padding
         payload_json = base64.urlsafe_b64decode(payload_b64)
-        return json.loads(payload_json)
+        return json_loads(payload_json)
     except:
         return {}
 
@@ -142,13 +193,14 @@ def decode_mandate_token(token: str) -> dict:
 # MCP TOOL WRAPPER
 # ========================================
 
-def call_mcp_tool(tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+def call_mcp_tool(tool_name: str, arguments: Dict[str, Any], timeout: tuple = None) -> Dict[str, Any]:
     """
     Call AgentGatePay MCP tool via JSON-RPC 2.0 protocol.
 
     Args:
         tool_name: MCP tool name (e.g., "agentpay_issue_mandate")
         arguments: Tool arguments as dictionary
+        timeout: (connect, read) seconds - defaults to HTTP_TIMEOUT
 
     Returns:
         Tool result as dictionary
@@ -170,17 +222,17 @@ def call_mcp_tool(tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
 
     print(f"   📡 Calling MCP tool: {tool_name}")
 
-    response = requests.post(AGENTPAY_MCP_ENDPOINT, json=payload, headers=headers)
+    response = http_session.post(AGENTPAY_MCP_ENDPOINT, data=json_dumps(payload), headers=headers, timeout=timeout or HTTP_TIMEOUT)
     response.raise_for_status()
 
-    result = response.json()
+    result = json_loads(response.content)
 
     if "error" in result:
         raise Exception(f"MCP error: {result['error']}")
 
     # MCP response format: result.content[0].text (JSON string)
     content_text = result['result']['content'][0]['text']
-    return json.loads(content_text)
+    return json_loads(content_text)
 
 
 # ========================================
@@ -188,6 +240,12 @@ def call_mcp_tool(tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
 # ========================================
 # Note: Clients initialized in main() after chain/token configuration
 
+# Shared HTTP session - keep-alive reuses TLS connections to the gateway, MCP endpoint and RPC
+HTTP_TIMEOUT = (3.05, 30)  # (connect, read) seconds
+SETTLEMENT_TIMEOUT = (3.05, 120)  # submit/verify may wait for on-chain settlement
+http_session = requests.Session()
+http_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
 web3 = None
 buyer_account = None
 
@@ -216,7 +274,7 @@ def mcp_issue_mandate(budget_usd: float) -> str:
             try:
                 verify_result = call_mcp_tool("agentpay_verify_mandate", {
                     "mandate_token": token
-                })
+                }, timeout=SETTLEMENT_TIMEOUT)
 
                 if verify_result.get('valid'):
                     budget_remaining = verify_result.get('budget_remaining', 'Unknown')
@@ -261,6 +319,40 @@ def mcp_issue_mandate(budget_usd: float) -> str:
         return f"Failed: {str(e)}"
 
 
+def send_raw_transactions(raw_transactions: list) -> list:
+    """
+    Broadcast signed transactions in a single JSON-RPC batch request.
+
+    Falls back to one send_raw_transaction call per transaction when the
+    RPC provider does not support batching. Returns 0x-prefixed tx hashes
+    in the same order as the input.
+    """
+    batch = [
+        {"jsonrpc": "2.0", "id": i, "method": "eth_sendRawTransaction", "params": ["0x" + bytes(raw).hex()]}
+        for i, raw in enumerate(raw_transactions)
+    ]
+
+    response = http_session.post(config.rpc_url, data=json_dumps(batch), headers={"Content-Type": "application/json"}, timeout=HTTP_TIMEOUT)
+    try:
+        # Providers/proxies may answer with an HTML, text or empty error body
+        results = json_loads(response.content) if response.ok else None
+    except ValueError:
+        results = None
+
+    if not isinstance(results, list):
+        # Provider rejected the batch - nothing was broadcast, send individually
+        return [web3.to_hex(web3.eth.send_raw_transaction(raw)) for raw in raw_transactions]
+
+    by_id = {item.get('id'): item for item in results}
+    tx_hashes = []
+    for i in range(len(raw_transactions)):
+        item = by_id.get(i, {})
+        if 'result' not in item:
+            raise Exception(f"eth_sendRawTransaction failed: {item.get('error', 'missing response')}")
+        tx_hashes.append(item['result'])
+    return tx_hashes
+
+
 def sign_blockchain_payment(amount_usd: float, recipient: str) -> str:
     """
     Sign blockchain payment locally (same as API version).
@@ -287,51 +379,57 @@ def sign_blockchain_payment(amount_usd: float, recipient: str) -> str:
         merchant_amount_atomic = int(merchant_amount_usd * (10 ** config.decimals))
         commission_amount_atomic = int(commission_amount_usd * (10 ** config.decimals))
 
-        transfer_function_signature = web3.keccak(text="transfer(address,uint256)")[:4]
+        # Fetch nonce once for both transactions ('pending' counts our own in-flight TXs)
+        nonce = web3.eth.get_transaction_count(buyer_account.address, 'pending')
 
-        # Fetch nonce once for both transactions
-        nonce = web3.eth.get_transaction_count(buyer_account.address)
+        # EIP-1559 fees from one eth_feeHistory call (next block's base fee + median tip), shared by both TXs
+        fee_history = web3.eth.fee_history(1, 'latest', [50])
+        rewards = fee_history.get('reward') or []
+        priority_fee = max(rewards[-1][0], MIN_PRIORITY_FEE_WEI) if rewards else MIN_PRIORITY_FEE_WEI
+        max_fee = 2 * fee_history['baseFeePerGas'][-1] + priority_fee
 
-        print(f"   📤 TX 1/2 (merchant)...")
-        recipient_clean = recipient.replace('0x', '').lower()
-        recipient_bytes = bytes.fromhex(recipient_clean).rjust(32, b'\x00')
+        recipient_bytes = _pad_address(recipient)
 
-        merchant_data = transfer_function_signature + recipient_bytes + merchant_amount_atomic.to_bytes(32, byteorder='big')
+        merchant_data = TRANSFER_SELECTOR + recipient_bytes + merchant_amount_atomic.to_bytes(32, byteorder='big')
 
         merchant_tx = {
             'nonce': nonce,
             'to': config.token_contract,
             'value': 0,
             'gas': 100000,
-            'gasPrice': web3.eth.gas_price,
+            'type': 2,
+            'maxFeePerGas': max_fee,
+            'maxPriorityFeePerGas': priority_fee,
             'data': merchant_data,
             'chainId': config.chain_id
         }
 
-        signed_merchant_tx = buyer_account.sign_transaction(merchant_tx)
-        tx_hash_merchant_raw = web3.eth.send_raw_transaction(signed_merchant_tx.raw_transaction)
-        tx_hash_merchant = f"0x{tx_hash_merchant_raw.hex()}" if not tx_hash_merchant_raw.hex().startswith('0x') else tx_hash_merchant_raw.hex()
-        print(f"   ✅ TX 1/2 sent: {tx_hash_merchant[:20]}...")
-
-        print(f"   📤 TX 2/2 (commission)...")
-        commission_addr_clean = commission_address.replace('0x', '').lower()
-        commission_addr_bytes = bytes.fromhex(commission_addr_clean).rjust(32, b'\x00')
+        commission_addr_bytes = _pad_address(commission_address)
 
-        commission_data = transfer_function_signature + commission_addr_bytes + commission_amount_atomic.to_bytes(32, byteorder='big')
+        commission_data = TRANSFER_SELECTOR + commission_addr_bytes + commission_amount_atomic.to_bytes(32, byteorder='big')
 
         commission_tx = {
             'nonce': nonce + 1,
             'to': config.token_contract,
             'value': 0,
             'gas': 100000,
-            'gasPrice': web3.eth.gas_price,
+            'type': 2,
+            'maxFeePerGas': max_fee,
+            'maxPriorityFeePerGas': priority_fee,
             'data': commission_data,
             'chainId': config.chain_id
         }
 
+        # Sign both up front so they can be broadcast in one JSON-RPC batch
+        signed_merchant_tx = buyer_account.sign_transaction(merchant_tx)
         signed_commission_tx = buyer_account.sign_transaction(commission_tx)
-        tx_hash_commission_raw = web3.eth.send_raw_transaction(signed_commission_tx.raw_transaction)
-        tx_hash_commission = f"0x{tx_hash_commission_raw.hex()}" if not tx_hash_commission_raw.hex().startswith('0x') else tx_hash_commission_raw.hex()
+
+        print(f"   📤 Broadcasting TX 1/2 (merchant) + TX 2/2 (commission)...")
+        tx_hash_merchant, tx_hash_commission = send_raw_transactions([
+            signed_merchant_tx.raw_transaction,
+            signed_commission_tx.raw_transaction
+        ])
+        print(f"   ✅ TX 1/2 sent: {tx_hash_merchant[:20]}...")
         print(f"   ✅ TX 2/2 sent: {tx_hash_commission[:20]}...")
 
         merchant_tx_hash = tx_hash_merchant
@@ -355,13 +453,19 @@ def mcp_submit_and_verify_payment() -> str:
 
     try:
         # Submit payment via MCP
-        result = call_mcp_tool("agentpay_submit_payment", {
-            "mandate_token": current_mandate['mandate_token'],
-            "tx_hash": merchant_tx_hash,
-            "tx_hash_commission": commission_tx_hash,
-            "chain": config.chain,
-            "token": config.token
-        })
+        try:
+            result = call_mcp_tool("agentpay_submit_payment", {
+                "mandate_token": current_mandate['mandate_token'],
+                "tx_hash": merchant_tx_hash,
+                "tx_hash_commission": commission_tx_hash,
+                "chain": config.chain,
+                "token": config.token
+            }, timeout=SETTLEMENT_TIMEOUT)
+        except requests.HTTPError as e:
+            if e.response is not None and 400 <= e.response.status_code < 500:
+                # Gateway rejected the payment - its commission address may have rotated
+                invalidate_commission_config()
+            raise
 
         print(f"✅ Payment submitted via MCP")
         print(f"   Status: {result.get('status', 'N/A')}")
@@ -370,7 +474,7 @@ def mcp_submit_and_verify_payment() -> str:
         print(f"   🔍 Fetching updated budget...")
         verify_result = call_mcp_tool("agentpay_verify_mandate", {
             "mandate_token": current_mandate['mandate_token']
-        })
+        }, timeout=SETTLEMENT_TIMEOUT)
 
         if verify_result.get('valid'):
             new_budget = verify_result.get('budget_remaining', 'Unknown')
@@ -402,7 +506,7 @@ tools = [
     ),
     Tool(
         name="sign_payment",
-        func=lambda params: sign_blockchain_payment(*[float(params.split(',')[0]), params.split(',')[1]]),
+        func=lambda params: sign_blockchain_payment(*[float(params.split(',')[0]), params.split(',')[1].strip()]),
         description="Sign blockchain payment locally (Web3). Input: 'amount_usd,recipient_address'"
     ),
     Tool(
@@ -418,7 +522,7 @@ tools = [
 
 # Initialize LLM
 llm = ChatOpenAI(
-    model="gpt-4",
+    model="gpt-4o-mini",
     temperature=0,
     openai_api_key=os.getenv('OPENAI_API_KEY')
 )
@@ -482,7 +586,7 @@ if __name__ == "__main__":
     print("=" * 80)
 
     # Initialize clients with selected configuration
-    web3 = Web3(Web3.HTTPProvider(config.rpc_url))
+    web3 = Web3(Web3.HTTPProvider(config.rpc_url, session=http_session))
     buyer_account = Account.from_key(BUYER_PRIVATE_KEY)
 
     print(f"\nInitialized AgentGatePay MCP client: {AGENTPAY_MCP_ENDPOINT}")
@@ -499,7 +603,7 @@ if __name__ == "__main__":
         try:
             verify_result = call_mcp_tool("agentpay_verify_mandate", {
                 "mandate_token": token
-            })
+            }, timeout=SETTLEMENT_TIMEOUT)
 
             if verify_result.get('valid'):
                 budget_remaining = verify_result.get('budget_remaining', 'Unknown')
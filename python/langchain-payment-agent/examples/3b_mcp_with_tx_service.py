@@ -420,7 +420,7 @@ tools = [
 
 # Initialize LLM
 llm = ChatOpenAI(
-    model="gpt-4",
+    model="gpt-4o-mini",
     temperature=0,
     openai_api_key=os.getenv('OPENAI_API_KEY')
 )
@@ -26,12 +26,14 @@ Requirements:
 """
 
 import os
+import re
 import sys
 import time
 import json
 import base64
 import requests
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any
 from dotenv import load_dotenv
 from web3 import Web3
@@ -49,7 +51,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from utils import save_mandate, get_mandate, clear_mandate
 
 # Chain configuration from .env
-from chain_config import get_chain_config, ChainConfig
+from chain_config import get_chain_config, ChainConfig, BLOCK_TIME_SECONDS
 
 # Load environment variables
 load_dotenv()
@@ -88,6 +90,19 @@ SELLER_API_URL = os.getenv('SELLER_API_URL', 'http://localhost:8000')
 # Payment configuration
 MANDATE_BUDGET_USD = float(os.getenv('MANDATE_BUDGET_USD', 100.0))
 
+# ERC-20 transfer(address,uint256) selector - first 4 bytes of its keccak256 hash
+TRANSFER_SELECTOR = bytes.fromhex("a9059cbb")
+
+ADDRESS_RE = re.compile(r'0x[0-9a-fA-F]{40}')
+
+def _pad_address(address: str) -> bytes:
+    """Left-pad a 0x-prefixed 20-byte address to a 32-byte ABI word"""
+    # int() alone would also accept truncated/odd-length hex, '_' and whitespace and
+    # silently pad it into a different address - transfers can't be reversed
+    if not ADDRESS_RE.fullmatch(address):
+        raise ValueError(f"Invalid address (expected 0x + 40 hex digits): {address!r}")
+    return int(address, 16).to_bytes(32, byteorder='big')
+
 # Chain/token configuration - loaded from .env in main()
 CHAIN_CONFIG = None  # Set in main() from chain_config
 
@@ -399,17 +414,19 @@ class BuyerAgent:
             print(f"   Merchant: ${merchant_usd:.4f} ({merchant_atomic} atomic)")
             print(f"   Commission: ${commission_usd:.4f} ({commission_atomic} atomic)")
 
-            # ERC-20 transfer function
-            transfer_sig = self.web3.keccak(text="transfer(address,uint256)")[:4]
+            # Validate and pad both addresses before anything is sent, so a bad
+            # commission address can't fail after the merchant TX is on its way
+            recipient_word = _pad_address(payment_info['recipient'])
+            commission_word = _pad_address(commission_address)
 
-            # Get nonce ONCE before both transactions
-            merchant_nonce = self.web3.eth.get_transaction_count(self.account.address)
+            # Get nonce ONCE before both transactions ('pending' counts our own in-flight TXs)
+            merchant_nonce = self.web3.eth.get_transaction_count(self.account.address, 'pending')
             print(f"   📊 Current nonce: {merchant_nonce}")
 
             # TX 1: Merchant payment
             print(f"   📤 Signing merchant transaction...")
-            merchant_data = transfer_sig + \
-                           self.web3.to_bytes(hexstr=payment_info['recipient']).rjust(32, b'\x00') + \
+            merchant_data = TRANSFER_SELECTOR + \
+                           recipient_word + \
                            merchant_atomic.to_bytes(32, byteorder='big')
 
             merchant_tx = {
@@ -428,8 +445,8 @@ class BuyerAgent:
 
             # TX 2: Commission payment (sign and send immediately - parallel execution)
             print(f"   📤 Signing commission transaction...")
-            commission_data = transfer_sig + \
-                             self.web3.to_bytes(hexstr=commission_address).rjust(32, b'\x00') + \
+            commission_data = TRANSFER_SELECTOR + \
+                             commission_word + \
                              commission_atomic.to_bytes(32, byteorder='big')
 
             commission_tx = {
@@ -489,10 +506,17 @@ class BuyerAgent:
             # Verify transactions on-chain (120s timeout for Ethereum public RPCs)
             print(f"   🔍 Verifying transactions on-chain...")
             try:
-                receipt_merchant = self.web3.eth.wait_for_transaction_receipt(tx_hash_merchant, timeout=120)
+                # Both TXs are already in the mempool (nonce, nonce + 1) - wait for them concurrently,
+                # polling once per block instead of web3's default 0.1s
+                poll_latency = BLOCK_TIME_SECONDS.get(self.config.chain, 1.0)
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    receipt_merchant, receipt_commission = executor.map(
+                        lambda tx_hash: self.web3.eth.wait_for_transaction_receipt(
+                            tx_hash, timeout=120, poll_latency=poll_latency
+                        ),
+                        [tx_hash_merchant, tx_hash_commission]
+                    )
                 print(f"   ✅ Merchant TX confirmed (block {receipt_merchant['blockNumber']})")
-
-                receipt_commission = self.web3.eth.wait_for_transaction_receipt(tx_hash_commission, timeout=120)
                 print(f"   ✅ Commission TX confirmed (block {receipt_commission['blockNumber']})")
             except Exception as e:
                 print(f"   ⚠️  Verification failed: {e}")
@@ -713,7 +737,6 @@ if __name__ == "__main__":
             ttl_input = "7d"
 
         # Parse duration
-        import re
         match = re.match(r'^(\d+)([mhd])$', ttl_input)
 
         if match:
@@ -1,3 +1,4 @@
 from .mandate_storage import save_mandate, get_mandate, clear_mandate
+from .config_cache import get_cached_config, save_cached_config, clear_cached_config
 
-__all__ = ['save_mandate', 'get_mandate', 'clear_mandate']
+__all__ = ['save_mandate', 'get_mandate', 'clear_mandate', 'get_cached_config', 'save_cached_config', 'clear_cached_config']
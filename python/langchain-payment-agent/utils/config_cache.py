@@ -0,0 +1,72 @@
+"""
+Simple config cache - stores gateway config (e.g. commission) to reuse across runs
+"""
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+CACHE_FILE = Path(__file__).parent.parent / ".agentgatepay_config_cache.json"
+
+def get_cached_config(name: str, scope: str) -> tuple:
+    """
+    Get cached config entry for scope (e.g. the gateway URL) if it has not expired.
+
+    Returns (data, seconds_left), or (None, 0) when there is no fresh entry.
+    """
+    if _cache_disabled():
+        return None, 0
+
+    entry = _load_cache().get(_cache_key(name, scope))
+    seconds_left = entry.get('expires', 0) - time.time() if entry else 0
+    if seconds_left <= 0:
+        return None, 0
+
+    return entry.get('data'), seconds_left
+
+def save_cached_config(name: str, scope: str, data: dict, ttl_seconds: int):
+    """Save config entry for scope for reuse until ttl_seconds from now"""
+    if _cache_disabled():
+        return
+
+    cache = _load_cache()
+    cache[_cache_key(name, scope)] = {
+        'data': data,
+        'expires': time.time() + ttl_seconds
+    }
+    _save_cache(cache)
+
+def clear_cached_config(name: str, scope: str):
+    """Drop the config entry for scope so the next lookup fetches fresh"""
+    cache = _load_cache()
+    if cache.pop(_cache_key(name, scope), None) is not None:
+        _save_cache(cache)
+
+def _cache_key(name: str, scope: str) -> str:
+    # Scoped so switching gateways (staging vs prod) never reuses the other's config
+    return f"{name}:{scope}"
+
+def _cache_disabled() -> bool:
+    # Set AGENTPAY_DISABLE_CONFIG_CACHE=1 to always fetch fresh config (debugging)
+    return os.getenv('AGENTPAY_DISABLE_CONFIG_CACHE') == '1'
+
+def _load_cache() -> dict:
+    if not CACHE_FILE.exists():
+        return {}
+    try:
+        return json.loads(CACHE_FILE.read_text())
+    except Exception:
+        return {}
+
+def _save_cache(data: dict):
+    # Write to a temp file and rename so a crash never leaves a half-written cache
+    fd, tmp_path = tempfile.mkstemp(dir=CACHE_FILE.parent, prefix=CACHE_FILE.name, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, CACHE_FILE)
+    except Exception:
+        # Cache is best-effort - a failed write just means the next run fetches again
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
@@ -3,19 +3,29 @@ Simple mandate storage - stores mandate tokens to reuse across runs
 """
 import json
 import os
+import tempfile
 from datetime import datetime
 from pathlib import Path
 
 STORAGE_FILE = Path(__file__).parent.parent / ".agentgatepay_mandates.json"
 
+# In-memory copy of the storage file, reused while the file's mtime is unchanged
+_cache = None
+_cache_mtime = None
+
 def save_mandate(agent_id: str, mandate_data: dict):
     """Save mandate for reuse"""
     storage = _load_storage()
+    # 'is None', not 'or' - an exhausted budget of 0 must not fall back to the full budget_usd
+    budget_remaining = mandate_data.get('budget_remaining')
+    if budget_remaining is None:
+        budget_remaining = mandate_data.get('budget_usd')
     storage[agent_id] = {
         'mandate_token': mandate_data.get('mandate_token'),
         'expires_at': mandate_data.get('expires_at'),
-        'budget_remaining': mandate_data.get('budget_remaining') or mandate_data.get('budget_usd'),
+        'budget_remaining': budget_remaining,
         'budget_usd': mandate_data.get('budget_usd'),
+        'budget_verified_at': mandate_data.get('budget_verified_at'),
         'saved_at': datetime.now().isoformat()
     }
     _save_storage(storage)
@@ -34,7 +44,7 @@ def get_mandate(agent_id: str) -> dict:
         _save_storage(storage)
         return None
 
-    return mandate
+    return dict(mandate)
 
 def clear_mandate(agent_id: str):
     """Clear stored mandate"""
@@ -44,12 +54,34 @@ def clear_mandate(agent_id: str):
         _save_storage(storage)
 
 def _load_storage() -> dict:
-    if not STORAGE_FILE.exists():
-        return {}
+    global _cache, _cache_mtime
     try:
-        return json.loads(STORAGE_FILE.read_text())
-    except:
+        mtime = STORAGE_FILE.stat().st_mtime_ns
+    except FileNotFoundError:
         return {}
 
+    if _cache is None or mtime != _cache_mtime:
+        try:
+            _cache = json.loads(STORAGE_FILE.read_text())
+        except Exception:
+            return {}
+        _cache_mtime = mtime
+
+    # Shallow copy so callers can add/remove entries without touching the cache
+    return dict(_cache)
+
 def _save_storage(data: dict):
-    STORAGE_FILE.write_text(json.dumps(data, indent=2))
+    global _cache, _cache_mtime
+    # Write to a temp file and rename so a crash (or an interrupted background
+    # save) never leaves a half-written mandate file
+    fd, tmp_path = tempfile.mkstemp(dir=STORAGE_FILE.parent, prefix=STORAGE_FILE.name, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, STORAGE_FILE)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _cache = data
+    _cache_mtime = STORAGE_FILE.stat().st_mtime_ns